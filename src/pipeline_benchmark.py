@@ -0,0 +1,256 @@
+# 번호판 파이프라인 단계별/연산자별 성능 측정 (pipeline_benchmark.py)
+#
+# extracted_plates/와 img/의 이미지, 그리고 4K까지 확대한 합성 이미지에 대해
+# 각 단계의 p50/p95 지연 시간, 처리량, 최대 메모리를 측정하여 JSON으로 저장합니다.
+# --compare로 저장해 둔 기준 결과와 비교하면 느려진 항목을 표시합니다.
+
+import cv2
+import numpy as np
+import os
+import io
+import sys
+import json
+import time
+import glob
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+
+import plate_processor as pp
+
+
+# 합성 입력 크기 (이름 → (너비, 높이))
+SYNTHETIC_SIZES = {
+    '720p': (1280, 720),
+    '1080p': (1920, 1080),
+    '4k': (3840, 2160),
+}
+
+
+def _roberts(img):
+    # edge_roberts.py와 같은 로버츠 교차 커널
+    gx = cv2.filter2D(img, -1, np.array([[1, 0], [0, -1]]))
+    gy = cv2.filter2D(img, -1, np.array([[0, 1], [-1, 0]]))
+    return gx + gy
+
+
+def _warp_affine(img):
+    # rotate_getmatrix.py와 같은 중앙 기준 45도, 0.5배 회전
+    rows, cols = img.shape[:2]
+    m45 = cv2.getRotationMatrix2D((cols / 2, rows / 2), 45, 0.5)
+    return cv2.warpAffine(img, m45, (cols, rows))
+
+
+def _warp_perspective(img):
+    # perspective.py와 같은 사다리꼴 원근 변환
+    rows, cols = img.shape[:2]
+    pts1 = np.float32([[0, 0], [0, rows], [cols, 0], [cols, rows]])
+    pts2 = np.float32([[100, 50], [10, rows - 50], [cols - 100, 50], [cols - 10, rows - 50]])
+    mtrx = cv2.getPerspectiveTransform(pts1, pts2)
+    return cv2.warpPerspective(img, mtrx, (cols, rows))
+
+
+_K3 = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+_K5 = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
+
+# 단독 연산자 (각 예제 스크립트와 같은 파라미터)
+OPERATORS = {
+    'blur_avg': lambda img: cv2.blur(img, (10, 10)),
+    'blur_avg_kernel': lambda img: cv2.filter2D(img, -1, np.ones((5, 5)) / 5 ** 2),
+    'blur_gaussian': lambda img: cv2.GaussianBlur(img, (3, 3), 0),
+    'blur_median': lambda img: cv2.medianBlur(img, 5),
+    'blur_bilateral': lambda img: cv2.bilateralFilter(img, 5, 75, 75),
+    'morph_erode': lambda img: cv2.erode(img, _K3),
+    'morph_dilate': lambda img: cv2.dilate(img, _K3),
+    'morph_open': lambda img: cv2.morphologyEx(img, cv2.MORPH_OPEN, _K5),
+    'morph_close': lambda img: cv2.morphologyEx(img, cv2.MORPH_CLOSE, _K5),
+    'edge_roberts': _roberts,
+    'edge_canny': lambda img: cv2.Canny(img, 100, 200),
+    'warp_affine': _warp_affine,
+    'warp_perspective': _warp_perspective,
+}
+
+
+def measure(func, arg, repeat, warmup=2):
+    """func(arg)를 repeat번 실행한 지연 시간(ms) 목록과 마지막 결과"""
+    for _ in range(warmup):
+        result = func(arg)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(arg)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings, result
+
+
+def peak_memory(func, arg):
+    """func(arg) 한 번 실행 중 새로 할당된 최대 메모리 (NumPy 배열 포함, 바이트)"""
+    tracemalloc.start()
+    try:
+        func(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def summarize(group, name, input_name, shape, timings, peak):
+    """측정 결과 한 행 생성"""
+    timings = np.asarray(timings)
+    return {
+        'group': group,
+        'name': name,
+        'input': input_name,
+        'size': f'{shape[1]}x{shape[0]}',
+        'n': len(timings),
+        'p50_ms': float(np.percentile(timings, 50)),
+        'p95_ms': float(np.percentile(timings, 95)),
+        'mean_ms': float(timings.mean()),
+        'throughput_per_s': float(1000 / timings.mean()) if timings.mean() > 0 else float('inf'),
+        'peak_mem_bytes': int(peak),
+    }
+
+
+def build_inputs(sizes, work_dir):
+    """(입력 이름, 파일 경로) 목록: 번호판/예제 이미지 + 합성 확대 이미지
+
+    합성 이미지는 로드 단계까지 측정할 수 있도록 work_dir에 PNG로 저장합니다.
+    """
+    plate_inputs = [(os.path.basename(p), p) for p in sorted(glob.glob(f'{pp.PLATE_DIR}/*.png'))]
+    image_inputs = [(os.path.basename(p), p) for p in sorted(glob.glob('../img/*.jpg'))]
+
+    synthetic_inputs = []
+    sources = [('plate', plate_inputs), ('img', image_inputs)]
+    for prefix, inputs in sources:
+        if not inputs:
+            continue
+        source = cv2.imread(inputs[0][1])
+        for size_name in sizes:
+            width, height = SYNTHETIC_SIZES[size_name]
+            path = os.path.join(work_dir, f'synthetic_{prefix}_{size_name}.png')
+            cv2.imwrite(path, cv2.resize(source, (width, height), interpolation=cv2.INTER_CUBIC))
+            synthetic_inputs.append((f'{prefix}@{size_name}', path))
+
+    plate_inputs += [item for item in synthetic_inputs if item[0].startswith('plate@')]
+    image_inputs += [item for item in synthetic_inputs if item[0].startswith('img@')]
+    return plate_inputs, image_inputs
+
+
+def pipeline_stages(work_dir):
+    """(단계 이름, 함수) 목록: 각 함수는 이전 단계의 출력을 입력으로 받음"""
+    save_path = os.path.join(work_dir, 'save_stage.png')
+    params = pp.PIPELINE_PARAMS
+    return [
+        ('load', cv2.imread),
+        ('grayscale', pp.convert_to_grayscale),
+        ('contrast', lambda gray: pp.maximize_contrast(gray, params['contrast_ksize'])),
+        ('threshold', lambda enhanced: pp.adaptive_threshold_plate(
+            enhanced, methods=('gaussian',), block_size=params['block_size'],
+            C=params['C'], blur_ksize=params['blur_ksize'])[0]),
+        ('contours', lambda thresh: pp.find_contours_in_plate(thresh)[1]),
+        ('save', lambda contour_image: cv2.imwrite(save_path, contour_image)),
+    ]
+
+
+def run_benchmark(sizes=('720p', '1080p', '4k'), repeat=20, operators=True):
+    """전체 측정 실행, 결과 행 목록 반환"""
+    rows = []
+    with tempfile.TemporaryDirectory() as work_dir, contextlib.redirect_stdout(io.StringIO()):
+        plate_inputs, image_inputs = build_inputs(sizes, work_dir)
+        stages = pipeline_stages(work_dir)
+
+        # 파이프라인 단계: 각 단계 출력이 다음 단계의 입력
+        for input_name, path in plate_inputs:
+            value = path
+            shape = cv2.imread(path).shape
+            for stage_name, func in stages:
+                timings, output = measure(func, value, repeat)
+                rows.append(summarize('pipeline', stage_name, input_name, shape,
+                                      timings, peak_memory(func, value)))
+                value = output
+
+        # 단독 연산자
+        if operators:
+            for input_name, path in image_inputs:
+                img = cv2.imread(path)
+                for op_name, func in OPERATORS.items():
+                    timings, _ = measure(func, img, repeat)
+                    rows.append(summarize('operator', op_name, input_name, img.shape,
+                                          timings, peak_memory(func, img)))
+    return rows
+
+
+def environment_info():
+    """결과 비교 시 참고할 실행 환경 정보"""
+    return {
+        'python': platform.python_version(),
+        'opencv': cv2.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'cv2_threads': cv2.getNumThreads(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def compare_results(rows, baseline_rows, tolerance=0.1, min_ms=0.05):
+    """기준 결과 대비 p50이 tolerance 비율 이상 느려진 항목 목록
+
+    min_ms보다 짧은 측정은 타이머 잡음이 커서 비교하지 않습니다.
+    """
+    baseline = {(r['group'], r['name'], r['input']): r for r in baseline_rows}
+    regressions = []
+    for row in rows:
+        base = baseline.get((row['group'], row['name'], row['input']))
+        if base is None or base['p50_ms'] < min_ms:
+            continue
+        ratio = row['p50_ms'] / base['p50_ms']
+        if ratio > 1 + tolerance:
+            regressions.append({**row, 'baseline_p50_ms': base['p50_ms'], 'ratio': ratio})
+    return regressions
+
+
+def print_report(rows):
+    """결과 표 출력"""
+    print(f"{'group':>9} {'name':>17} {'input':>22} {'size':>10} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'ops/s':>9} {'peak MB':>8}")
+    for r in rows:
+        print(f"{r['group']:>9} {r['name']:>17} {r['input']:>22} {r['size']:>10} {r['p50_ms']:>9.3f} "
+              f"{r['p95_ms']:>9.3f} {r['throughput_per_s']:>9.1f} {r['peak_mem_bytes'] / 1e6:>8.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='번호판 파이프라인 단계별/연산자별 성능 측정')
+    parser.add_argument('--sizes', nargs='*', default=list(SYNTHETIC_SIZES), choices=list(SYNTHETIC_SIZES),
+                        help='합성 입력 크기')
+    parser.add_argument('--repeat', type=int, default=20, help='항목별 반복 횟수')
+    parser.add_argument('--no-operators', action='store_true', help='단독 연산자 측정 생략')
+    parser.add_argument('--output', default='../bench_results.json', help='결과 JSON 파일')
+    parser.add_argument('--compare', help='비교할 기준 결과 JSON 파일')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='느려짐 허용 비율 (0.1 = 10%%)')
+    args = parser.parse_args()
+
+    # 기준 결과는 측정 전에 읽어 둠 (--output과 같은 파일이어도 새 결과로 덮어쓰기 전의 값과 비교)
+    baseline_rows = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline_rows = json.load(f)['results']
+
+    rows = run_benchmark(args.sizes, args.repeat, operators=not args.no_operators)
+    print_report(rows)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment_info(), 'results': rows}, f, indent=2)
+    print(f"결과 저장 완료: {args.output}")
+
+    if baseline_rows is not None:
+        regressions = compare_results(rows, baseline_rows, args.tolerance)
+        for r in regressions:
+            print(f"[느려짐] {r['group']}/{r['name']} ({r['input']}): "
+                  f"{r['baseline_p50_ms']:.3f} → {r['p50_ms']:.3f} ms (x{r['ratio']:.2f})")
+        if regressions:
+            print(f"기준 대비 느려진 항목: {len(regressions)}개")
+            sys.exit(1)
+        print("기준 대비 느려진 항목 없음")
@@ -0,0 +1,118 @@
+import threading
+import contextvars
+
+import numpy as np
+
+
+# 현재 번호판 처리 중인 버퍼 scope (None이면 풀을 쓰지 않음: OpenCV가 출력 배열을 새로 할당)
+_current_scope = contextvars.ContextVar('buffer_scope', default=None)
+
+# 현재 연결된 버퍼 풀 (None이면 풀을 쓰지 않음)
+_buffer_pool = None
+
+
+def set_buffer_pool(pool):
+    """버퍼 풀 연결 (None이면 풀 사용 안 함), 이전 풀 반환"""
+    global _buffer_pool
+    previous = _buffer_pool
+    _buffer_pool = pool
+    return previous
+
+
+def get_buffer_pool():
+    """현재 연결된 버퍼 풀 반환"""
+    return _buffer_pool
+
+
+def take_buffer(shape, dtype=np.uint8):
+    """현재 scope에서 (shape, dtype) 버퍼를 꺼냄 (scope가 없으면 None)
+
+    반환값을 OpenCV 함수의 dst=로 넘기면 scope 밖에서는 기존처럼 새 배열이 할당됩니다.
+    """
+    scope = _current_scope.get()
+    if scope is None:
+        return None
+    return scope.take(shape, dtype)
+
+
+def release_buffer(array):
+    """scope가 끝나기 전에 더 이상 쓰지 않는 버퍼를 반납 (현재 scope에서 꺼낸 버퍼가 아니면 무시)"""
+    scope = _current_scope.get()
+    if scope is not None:
+        scope.release(array)
+
+
+def in_buffer_scope():
+    """풀에서 꺼낸 버퍼를 쓰는 중인지 여부 (결과를 scope 밖으로 넘기려면 복사해야 함)"""
+    return _current_scope.get() is not None
+
+
+class BufferPool:
+    """(shape, dtype)별 빈 버퍼 목록
+
+    같은 크기의 번호판(추출기는 항상 300x150)을 계속 처리하면 처음 한 장 이후로는
+    모든 단계가 반납된 버퍼를 다시 쓰므로 새 배열을 할당하지 않습니다.
+    max_per_key: 키마다 보관할 빈 버퍼 최대 개수 (넘치는 버퍼는 버림)
+    여러 스레드가 각자의 scope로 같은 풀을 써도 되도록 빈 버퍼 목록은 잠금 아래에서 꺼내고 반납합니다
+    (scope 하나는 그 scope를 연 스레드/컨텍스트에서만 씀).
+    """
+
+    def __init__(self, max_per_key=8):
+        self.max_per_key = max_per_key
+        self._free = {}
+        self._lock = threading.Lock()
+        self.allocations = 0
+        self.reuses = 0
+
+    def take(self, shape, dtype=np.uint8):
+        key = (tuple(shape), np.dtype(dtype))
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                self.reuses += 1
+                return free.pop()
+            self.allocations += 1
+        return np.empty(key[0], dtype=key[1])
+
+    def give_back(self, array):
+        with self._lock:
+            free = self._free.setdefault((array.shape, array.dtype), [])
+            if len(free) < self.max_per_key:
+                free.append(array)
+
+    def scope(self):
+        """with 블록 안에서 take_buffer로 꺼낸 버퍼를 블록이 끝날 때 모두 반납하는 scope"""
+        return _BufferScope(self)
+
+    def clear(self):
+        with self._lock:
+            self._free.clear()
+
+
+class _BufferScope:
+    def __init__(self, pool):
+        self.pool = pool
+        self.taken = []
+
+    def take(self, shape, dtype):
+        array = self.pool.take(shape, dtype)
+        self.taken.append(array)
+        return array
+
+    def release(self, array):
+        for i, taken in enumerate(self.taken):
+            if taken is array:
+                del self.taken[i]
+                self.pool.give_back(array)
+                return
+
+    def __enter__(self):
+        self.token = _current_scope.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        _current_scope.reset(self.token)
+        for array in self.taken:
+            self.pool.give_back(array)
+        self.taken = []
+        return False
@@ -0,0 +1,276 @@
+# 번호판 처리 결과 캐시 (plate_cache.py)
+#
+# 입력 이미지 바이트와 단계별 파라미터의 해시를 키로 처리 결과를 디스크에 저장합니다.
+# 같은 입력/파라미터로 다시 처리하면 이미지 디코딩과 연산 없이 저장된 결과를 돌려줍니다.
+#
+# 요약 정보(윤곽선/잠재적 글자 수)와 단계별 배열을 따로 저장합니다. 요약은 항목당 수십 바이트라
+# 크기 한도와 무관하게 유지하므로, 배열이 삭제된 번호판도 요약만 필요하면 계속 적중합니다.
+
+import os
+import json
+import sqlite3
+import hashlib
+import zipfile
+import argparse
+import tempfile
+import threading
+
+import numpy as np
+
+from plate_fileutil import chmod_default
+
+
+# 캐시 항목에 저장하는 단계별 배열 이름 (원본은 extracted_plates에서 다시 읽을 수 있으므로 저장하지 않음)
+CACHED_ARRAYS = ('gray', 'enhanced', 'threshold', 'contour_result')
+
+# 압축해서 저장하는 배열 (이진 영상이라 1/10 이하로 줄어듦, 회색조 영상은 20% 정도만 줄어 그대로 저장)
+COMPRESSED_ARRAYS = ('threshold', 'contour_result')
+
+# 한도를 넘어 삭제할 때 max_bytes의 이 비율까지 줄임 (가득 찬 캐시에서 put마다 폴더를 훑지 않도록)
+EVICT_TARGET = 0.9
+
+# 배열 저장 한도 기본값: 150x300 번호판 항목 하나가 약 110 KB이므로 약 19,000장 분량
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+SUMMARY_DB = 'summaries.sqlite'
+
+
+def _write_npz(f, arrays):
+    """np.load로 읽을 수 있는 npz를 COMPRESSED_ARRAYS만 압축하여 기록"""
+    with zipfile.ZipFile(f, 'w', allowZip64=True) as archive:
+        for name, array in arrays.items():
+            info = zipfile.ZipInfo(f'{name}.npy')
+            info.compress_type = zipfile.ZIP_DEFLATED if name in COMPRESSED_ARRAYS else zipfile.ZIP_STORED
+            with archive.open(info, 'w', force_zip64=True) as member:
+                np.lib.format.write_array(member, np.asanyarray(array), allow_pickle=False)
+
+
+class PlateResultCache:
+    """요약은 모두 유지하고 배열은 크기 제한이 있는 LRU 방식으로 저장하는 내용 주소(content-addressed) 결과 캐시
+
+    요약 정보는 cache_dir/summaries.sqlite에, 단계별 배열은 cache_dir/<키>.npz에 저장합니다.
+    배열 항목은 마지막 접근 시각(mtime)이 오래된 것부터 삭제하여 전체 크기를 max_bytes 이하로 유지합니다.
+    put마다 폴더 전체를 훑지 않도록 전체 크기 추정값을 유지하다가, 추정값이 max_bytes를 넘을 때만
+    폴더를 훑어 실제 크기로 다시 맞추고 삭제합니다. 다른 프로세스가 함께 쓰는 항목은 추정값에
+    들어가지 않으므로 그만큼 늦게 삭제될 수 있지만, 삭제할 때마다 실제 크기로 다시 맞춥니다.
+
+    max_bytes는 배열을 다시 쓰는 경우(keep_arrays 또는 결과 파일이 지워진 번호판)의 작업 집합에 맞춥니다.
+    요약만 필요한 일괄 처리는 배열이 삭제되어도 적중하므로 번호판 수와 무관합니다.
+    """
+
+    def __init__(self, cache_dir='../plate_cache', max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._size_estimate = None
+        self._db = None
+        self._db_lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def __getstate__(self):
+        # 병렬 처리 작업자에 넘길 때 연결과 잠금은 넘기지 않고 작업자에서 새로 만듦
+        state = self.__dict__.copy()
+        state['_db'] = None
+        del state['_db_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._db_lock = threading.Lock()
+
+    def _summaries(self):
+        """요약 DB 연결 (처음 쓸 때 연결, 여러 프로세스가 함께 쓰도록 WAL 모드)"""
+        if self._db is None:
+            db = sqlite3.connect(os.path.join(self.cache_dir, SUMMARY_DB), timeout=30,
+                                 isolation_level=None, check_same_thread=False)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('CREATE TABLE IF NOT EXISTS summaries '
+                       '(key TEXT PRIMARY KEY, contours INTEGER, potential_chars INTEGER)')
+            self._db = db
+        return self._db
+
+    def _get_summary(self, key):
+        with self._db_lock:
+            return self._summaries().execute(
+                'SELECT contours, potential_chars FROM summaries WHERE key = ?', (key,)).fetchone()
+
+    def make_key(self, image_path, params):
+        """입력 파일 바이트 + 파라미터(JSON 직렬화)의 SHA-256 키 생성"""
+        digest = hashlib.sha256()
+        with open(image_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        digest.update(json.dumps(params, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.npz')
+
+    def contains(self, key, arrays=False):
+        """키의 요약(arrays이면 배열까지)이 있는지 (LRU 순서는 바꾸지 않음)"""
+        if arrays and not os.path.exists(self._entry_path(key)):
+            return False
+        return self._get_summary(key) is not None
+
+    def get(self, key, plate_name, keep_arrays=True):
+        """캐시 적중 시 결과 dict, 없으면 None
+
+        keep_arrays이면 CACHED_ARRAYS까지 읽으며, 배열 항목이 삭제되었으면 None을 반환합니다.
+        원본('original')은 저장하지 않으므로 호출하는 쪽에서 다시 읽어야 합니다.
+        """
+        summary = self._get_summary(key)
+        if summary is None:
+            return None
+        result = {'name': plate_name, 'contours': summary[0], 'potential_chars': summary[1]}
+        if not keep_arrays:
+            return result
+
+        path = self._entry_path(key)
+        try:
+            with np.load(path) as entry:
+                for name in CACHED_ARRAYS:
+                    result[name] = entry[name]
+        except (FileNotFoundError, KeyError, ValueError, OSError, zipfile.BadZipFile):
+            return None
+
+        # LRU 갱신: 접근 시각을 mtime으로 기록
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return result
+
+    def put(self, key, result):
+        """처리 결과 저장 (배열은 임시 파일에 쓴 뒤 rename하여 동시 실행에도 안전)"""
+        arrays = {name: result[name] for name in CACHED_ARRAYS}
+        entry_path = self._entry_path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            chmod_default(fd)
+            with os.fdopen(fd, 'wb') as f:
+                _write_npz(f, arrays)
+                size = f.tell()
+            replaced = os.path.getsize(entry_path) if os.path.exists(entry_path) else 0
+            os.replace(tmp_path, entry_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        # 배열을 먼저 쓰고 요약을 기록하여, 요약이 있으면 배열도 한 번은 저장된 상태가 되도록 함
+        with self._db_lock:
+            self._summaries().execute(
+                'INSERT OR REPLACE INTO summaries (key, contours, potential_chars) VALUES (?, ?, ?)',
+                (key, int(result['contours']), int(result['potential_chars'])))
+
+        if self._size_estimate is None:
+            self._size_estimate = sum(size for _, size, _ in self._entries())
+        else:
+            self._size_estimate += size - replaced
+        if self._size_estimate > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        """배열 항목의 (mtime, 크기, 경로) 목록"""
+        entries = []
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith('.npz'):
+                continue
+            path = os.path.join(self.cache_dir, filename)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """배열 전체 크기가 max_bytes를 넘으면 오래 사용하지 않은 배열 항목부터 max_bytes * EVICT_TARGET
+        이하가 될 때까지 삭제, 삭제 개수 반환 (요약은 유지)"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICT_TARGET if total > self.max_bytes else self.max_bytes
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        self._size_estimate = total
+        return removed
+
+    def invalidate(self, key):
+        """특정 키의 요약과 배열 삭제, 삭제 여부 반환"""
+        with self._db_lock:
+            removed = self._summaries().execute('DELETE FROM summaries WHERE key = ?', (key,)).rowcount > 0
+        path = self._entry_path(key)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return removed
+        if self._size_estimate is not None:
+            self._size_estimate -= size
+        return True
+
+    def clear(self):
+        """모든 요약과 배열 삭제, 삭제한 요약 개수 반환"""
+        with self._db_lock:
+            removed = self._summaries().execute('DELETE FROM summaries').rowcount
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._size_estimate = 0
+        return removed
+
+    def stats(self):
+        """요약 항목 수, 배열 항목 수, 배열 전체 크기(바이트)"""
+        with self._db_lock:
+            summaries = self._summaries().execute('SELECT COUNT(*) FROM summaries').fetchone()[0]
+        entries = self._entries()
+        return summaries, len(entries), sum(size for _, size, _ in entries)
+
+
+if __name__ == '__main__':
+    from plate_processor import cache_params, plate_path_for
+    from plate_loader import DEFAULT_PLATE_DIR, PlateLoader, set_plate_loader
+
+    parser = argparse.ArgumentParser(description='번호판 처리 결과 캐시 관리')
+    parser.add_argument('--cache-dir', default='../plate_cache', help='캐시 폴더')
+    parser.add_argument('--plate-dir', default=DEFAULT_PLATE_DIR, help='추출된 번호판 입력 폴더 (invalidate)')
+    parser.add_argument('--gray-decode', action='store_true',
+                        help='처리할 때 --gray-decode를 썼으면 지정 (invalidate, 캐시 키가 다름)')
+    parser.add_argument('--pipeline', help='처리할 때 쓴 파이프라인 설정 파일 (invalidate, 캐시 키가 다름)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('stats', help='캐시 항목 수와 크기 출력')
+    subparsers.add_parser('clear', help='모든 캐시 요약과 배열 삭제')
+    invalidate_parser = subparsers.add_parser('invalidate', help='지정한 번호판의 캐시 요약과 배열 삭제')
+    invalidate_parser.add_argument('plate_names', nargs='+', help='번호판 이름 (예: plate_01)')
+    args = parser.parse_args()
+
+    cache = PlateResultCache(args.cache_dir)
+    # 키는 처리할 때와 같은 cache_params()로 만들어야 하므로 로더/파이프라인을 같은 설정으로 연결
+    set_plate_loader(PlateLoader(args.plate_dir, args.gray_decode))
+    if args.pipeline:
+        from plate_processor import set_plate_pipeline
+        from plate_pipeline import load_pipeline
+        set_plate_pipeline(load_pipeline(args.pipeline))
+
+    if args.command == 'stats':
+        summaries, count, total = cache.stats()
+        print(f"요약 항목: {summaries}개, 배열 항목: {count}개, 배열 크기: {total / (1024 * 1024):.1f} MB")
+    elif args.command == 'clear':
+        print(f"캐시 항목 {cache.clear()}개 삭제 (요약 기준)")
+    else:
+        for plate_name in args.plate_names:
+            plate_path = plate_path_for(plate_name)
+            if not os.path.exists(plate_path):
+                print(f"파일을 찾을 수 없습니다: {plate_path}")
+                continue
+            removed = cache.invalidate(cache.make_key(plate_path, cache_params()))
+            print(f"{plate_name}: {'삭제됨' if removed else '캐시 항목 없음'}")
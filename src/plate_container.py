@@ -0,0 +1,249 @@
+# 단계별 결과 배열 묶음 파일 (plate_container.py)
+#
+# 번호판마다 PNG 4개(_1_gray, _2_enhanced, _3_threshold, _4_contours)를 쓰는 대신,
+# 여러 번호판의 단계별 배열을 압축 없이 파일 하나(.plates)에 이어 붙이고 끝에 색인을 둡니다.
+# 읽을 때는 파일을 메모리 매핑하여 디코딩이나 복사 없이 NumPy 뷰를 돌려주므로
+# 대량 재분석에서 PNG 디코딩 비용이 사라집니다.
+#
+# 파일 구조: MAGIC | 배열 데이터(각 64바이트 정렬) ... | 색인 JSON | 색인 위치(uint64 LE) | MAGIC
+#   색인: {키: {"offset": 바이트 위치, "shape": [...], "dtype": "uint8"}, ...}
+#   키는 저장 파일 이름에서 확장자를 뺀 것 (예: plate_01_1_gray)
+
+import os
+import glob
+import json
+import time
+import struct
+import argparse
+import tempfile
+import itertools
+
+import numpy as np
+
+from plate_fileutil import chmod_default
+
+
+MAGIC = b'PLATES01'
+CONTAINER_EXT = '.plates'
+ALIGNMENT = 64
+
+_FOOTER = struct.Struct('<Q')
+
+
+def _pad(f):
+    """다음 배열이 ALIGNMENT 바이트 경계에서 시작하도록 0으로 채움"""
+    remainder = f.tell() % ALIGNMENT
+    if remainder:
+        f.write(b'\0' * (ALIGNMENT - remainder))
+
+
+def write_container(path, arrays):
+    """{키: 배열}을 묶음 파일 하나로 저장 (임시 파일에 쓴 뒤 rename)"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    chmod_default(fd)
+    index = {}
+    with os.fdopen(fd, 'wb') as f:
+        f.write(MAGIC)
+        for key, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            _pad(f)
+            index[key] = {'offset': f.tell(), 'shape': list(array.shape), 'dtype': array.dtype.str}
+            f.write(memoryview(array).cast('B'))
+
+        index_offset = f.tell()
+        f.write(json.dumps(index).encode('utf-8'))
+        f.write(_FOOTER.pack(index_offset))
+        f.write(MAGIC)
+    os.replace(tmp_path, path)
+    return index
+
+
+def read_index(path):
+    """묶음 파일의 색인만 읽음 (배열 데이터는 읽지 않음)"""
+    with open(path, 'rb') as f:
+        f.seek(-(_FOOTER.size + len(MAGIC)), os.SEEK_END)
+        tail = f.read()
+        if not tail.endswith(MAGIC):
+            raise ValueError(f'묶음 파일 형식이 아닙니다: {path}')
+        index_offset, = _FOOTER.unpack(tail[:_FOOTER.size])
+        index_end = f.seek(-(_FOOTER.size + len(MAGIC)), os.SEEK_END)
+        f.seek(index_offset)
+        return json.loads(f.read(index_end - index_offset).decode('utf-8'))
+
+
+class PlateContainer:
+    """묶음 파일 하나를 메모리 매핑하여 키별 배열 뷰를 제공 (읽기 전용)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.index = read_index(path)
+        self._mmap = np.memmap(path, dtype=np.uint8, mode='r')
+
+    def __getitem__(self, key):
+        entry = self.index[key]
+        dtype = np.dtype(entry['dtype'])
+        count = int(np.prod(entry['shape'], dtype=np.int64))
+        return np.frombuffer(self._mmap, dtype=dtype, count=count,
+                             offset=entry['offset']).reshape(entry['shape'])
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def keys(self):
+        return self.index.keys()
+
+    def close(self):
+        # 매핑은 남아 있는 뷰가 모두 해제될 때 닫힘
+        self._mmap = None
+
+
+class PlateContainerSet:
+    """폴더 안의 모든 묶음 파일을 하나의 키 공간으로 조회 (같은 키는 나중 파일이 우선)"""
+
+    def __init__(self, save_dir='../processed_plates'):
+        self.containers = [PlateContainer(path)
+                           for path in sorted(glob.glob(os.path.join(save_dir, f'*{CONTAINER_EXT}')))]
+        self._owner = {}
+        for container in self.containers:
+            for key in container.keys():
+                self._owner[key] = container
+
+    def __getitem__(self, key):
+        return self._owner[key][key]
+
+    def __contains__(self, key):
+        return key in self._owner
+
+    def __len__(self):
+        return len(self._owner)
+
+    def keys(self):
+        return self._owner.keys()
+
+    def plate(self, plate_name):
+        """번호판 하나의 {단계 접미사: 배열 뷰} (단계 접미사로 키를 만들어 바로 조회)"""
+        from plate_processor import PROCESSED_SUFFIXES
+        keys = ((suffix, f'{plate_name}_{suffix}') for suffix in PROCESSED_SUFFIXES)
+        return {suffix: self[key] for suffix, key in keys if key in self._owner}
+
+    def close(self):
+        for container in self.containers:
+            container.close()
+
+
+class ContainerWriter:
+    """save_processed_results의 결과를 묶음 파일로 모으는 image writer (plate_writer와 같은 인터페이스)
+
+    write()는 배열을 메모리에 모으고, flush()/close() 때 모인 배열을 묶음 파일 하나로 저장합니다.
+    병렬 배치 처리에서도 작업 묶음마다 flush하지 않고(flush_per_batch) 작업 프로세스가 끝날 때 저장하므로
+    배치 하나가 작업 프로세스마다 파일 하나가 됩니다.
+    모인 배열이 max_pending_bytes 바이트 또는 max_pending개를 넘으면 write()에서 바로 파일로 저장하므로
+    flush 없이 오래 쓰는 경우(큰 작업 묶음, 단일 프로세스 처리)에도 메모리 사용량이 제한됩니다.
+    넘긴 배열은 flush될 때까지 수정하면 안 됩니다.
+    """
+
+    ext = CONTAINER_EXT
+    retains_images = True
+    flush_per_batch = False
+
+    def __init__(self, save_dir='../processed_plates', prefix='batch', max_pending_bytes=256 * 1024 * 1024,
+                 max_pending=1024):
+        self.save_dir = save_dir
+        self.prefix = prefix
+        self.max_pending_bytes = max_pending_bytes
+        self.max_pending = max_pending
+        self.config = {'fmt': 'container', 'save_dir': save_dir, 'prefix': prefix,
+                       'max_pending_bytes': max_pending_bytes, 'max_pending': max_pending}
+        self.errors = []
+        self._pending = {}
+        self._pending_bytes = 0
+        self._counter = itertools.count(1)
+        self._written = None
+        os.makedirs(save_dir, exist_ok=True)
+
+    @staticmethod
+    def _key(path):
+        return os.path.splitext(os.path.basename(path))[0]
+
+    def write(self, path, image):
+        key = self._key(path)
+        previous = self._pending.get(key)
+        if previous is not None:
+            self._pending_bytes -= previous.nbytes
+        self._pending[key] = image
+        self._pending_bytes += image.nbytes
+        if self._pending_bytes >= self.max_pending_bytes or len(self._pending) >= self.max_pending:
+            self._write_pending()
+
+    def exists(self, path):
+        key = self._key(path)
+        return key in self._pending or key in self._written_keys()
+
+    def _written_keys(self):
+        """저장된 묶음 파일의 키 (결과 캐시가 exists()를 처음 호출할 때 폴더의 색인을 읽음)"""
+        if self._written is None:
+            self._written = set()
+            for path in glob.glob(os.path.join(self.save_dir, f'*{CONTAINER_EXT}')):
+                self._written.update(read_index(path))
+        return self._written
+
+    def _write_pending(self):
+        """모인 배열을 <prefix>_<타임스탬프>_<pid>_<순번>.plates로 저장 (오류는 errors에 모음)"""
+        if not self._pending:
+            return
+        timestamp = time.strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(self.save_dir,
+                            f'{self.prefix}_{timestamp}_{os.getpid()}_{next(self._counter):04d}{CONTAINER_EXT}')
+        try:
+            write_container(path, self._pending)
+        except OSError as e:
+            print(f"묶음 파일 저장 실패: {path} ({e})")
+            self.errors.append((path, e))
+        else:
+            if self._written is not None:
+                self._written.update(self._pending)
+        self._pending = {}
+        self._pending_bytes = 0
+
+    def flush(self):
+        """모인 배열을 묶음 파일로 저장하고, 지금까지 발생한 저장 오류 목록을 반환하고 비움"""
+        self._write_pending()
+        errors, self.errors = self.errors, []
+        return errors
+
+    def close(self):
+        return self.flush()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='단계별 결과 묶음 파일 조회')
+    parser.add_argument('--save-dir', default='../processed_plates', help='묶음 파일 폴더')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('info', help='묶음 파일별 항목 수와 크기 출력')
+    export_parser = subparsers.add_parser('export', help='지정한 번호판의 단계별 배열을 PNG로 저장')
+    export_parser.add_argument('plate_names', nargs='+', help='번호판 이름 (예: plate_01)')
+    args = parser.parse_args()
+
+    containers = PlateContainerSet(args.save_dir)
+
+    if args.command == 'info':
+        for container in containers.containers:
+            size = os.path.getsize(container.path)
+            print(f"{os.path.basename(container.path)}: {len(container)}개 배열, {size / (1024 * 1024):.1f} MB")
+        print(f"전체: {len(containers.containers)}개 파일, {len(containers)}개 배열")
+    else:
+        import cv2
+
+        for plate_name in args.plate_names:
+            stages = containers.plate(plate_name)
+            if not stages:
+                print(f"묶음 파일에 없는 번호판입니다: {plate_name}")
+                continue
+            for suffix, array in stages.items():
+                cv2.imwrite(os.path.join(args.save_dir, f'{plate_name}_{suffix}.png'), array)
+            print(f"{plate_name}: {len(stages)}개 단계 PNG 저장")
+
+    containers.close()
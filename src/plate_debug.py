@@ -0,0 +1,115 @@
+import os
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+
+# 현재 연결된 디버그 sink (None이면 헤드리스 모드: 연산 결과만 반환)
+_debug_sink = None
+
+
+def set_debug_sink(sink):
+    """디버그 시각화 sink 연결 (None을 넘기면 헤드리스 모드), 이전 sink 반환"""
+    global _debug_sink
+    previous = _debug_sink
+    _debug_sink = sink
+    return previous
+
+
+def get_debug_sink():
+    """현재 연결된 디버그 sink 반환"""
+    return _debug_sink
+
+
+def debug_enabled():
+    """디버그 sink가 연결되어 있는지 여부"""
+    return _debug_sink is not None
+
+
+def emit_debug(stage, build_panels):
+    """sink가 연결된 경우에만 시각화 패널 생성을 요청
+
+    build_panels는 (figsize, [(image, title, cmap), ...])를 반환하는 함수로,
+    sink가 없으면 호출되지 않으므로 헤드리스 모드에서는 그림 비용이 0입니다.
+    """
+    if _debug_sink is None:
+        return
+    _debug_sink.submit(stage, build_panels)
+
+
+def _draw_panels(fig, panels):
+    """Figure에 1행 N열 서브플롯으로 패널 그리기"""
+    for i, (image, title, cmap) in enumerate(panels):
+        ax = fig.add_subplot(1, len(panels), i + 1)
+        ax.imshow(image, cmap=cmap)
+        ax.set_title(title)
+        ax.axis('off')
+    fig.tight_layout()
+
+
+class PlotDebugSink:
+    """plt.show()로 단계별 결과를 바로 띄우는 대화형 sink (기존 동작)"""
+
+    def submit(self, stage, build_panels):
+        from matplotlib import pyplot as plt
+
+        figsize, panels = build_panels()
+        fig = plt.figure(figsize=figsize)
+        _draw_panels(fig, panels)
+        plt.show()
+
+    def close(self):
+        pass
+
+
+class FileDebugSink:
+    """백그라운드 스레드에서 Figure를 렌더링하여 PNG로 저장하는 sink
+
+    패널 생성과 렌더링이 모두 작업 스레드에서 실행되므로
+    파이프라인 스레드는 OpenCV 연산만 수행합니다.
+    대기 중인 렌더링은 max_pending개(기본 max_workers * 4)까지만 두고, 넘으면 가장 오래된 렌더링이
+    끝날 때까지 기다리므로 렌더링이 느려도 패널 이미지가 쌓이지 않습니다. 끝난 작업은 저장 경로만 남깁니다.
+    """
+
+    def __init__(self, save_dir='../debug_plates', max_workers=1, max_pending=None):
+        self.save_dir = save_dir
+        os.makedirs(save_dir, exist_ok=True)
+        self.max_pending = max_pending or max_workers * 4
+        self._counter = itertools.count(1)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._pending = deque()
+        self._paths = []
+
+    def submit(self, stage, build_panels):
+        # 끝난 작업은 결과만 모으고, 대기열이 가득 차면 가장 오래된 작업을 기다림
+        while self._pending and (self._pending[0].done() or len(self._pending) >= self.max_pending):
+            self._collect(self._pending.popleft())
+        index = next(self._counter)
+        self._pending.append(self._executor.submit(self._render, index, stage, build_panels))
+
+    def _collect(self, future):
+        try:
+            self._paths.append(future.result())
+        except Exception as e:
+            print(f"디버그 이미지 렌더링 실패: {e}")
+
+    def _render(self, index, stage, build_panels):
+        # pyplot 상태를 쓰지 않는 Figure + Agg 캔버스로 스레드 안전하게 렌더링
+        figsize, panels = build_panels()
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        _draw_panels(fig, panels)
+        path = f'{self.save_dir}/{index:05d}_{stage}.png'
+        fig.savefig(path)
+        return path
+
+    def close(self):
+        """대기 중인 렌더링을 모두 마치고 작업 스레드 종료, 저장된 경로 반환"""
+        self._executor.shutdown(wait=True)
+        while self._pending:
+            self._collect(self._pending.popleft())
+        paths, self._paths = self._paths, []
+        return paths
@@ -0,0 +1,42 @@
+# 파일 저장 공통 도우미 (plate_fileutil.py)
+#
+# 임시 파일에 쓴 뒤 rename하는 모듈(순번 할당, 결과 캐시, 묶음 파일, 계측, 감시 상태)이 함께 씁니다.
+# mkstemp는 임시 파일을 0600으로 만들므로 rename 전에 open()으로 만든 파일과 같은 권한으로 바꿉니다.
+
+import os
+import threading
+
+
+# 처음 chmod_default를 호출할 때 읽어 두는 umask (모듈을 읽을 때 umask를 바꾸지 않도록 늦게 읽음)
+_umask = None
+_umask_lock = threading.Lock()
+
+
+def _read_umask():
+    """현재 umask
+
+    Linux는 /proc/self/status에서 값을 바꾸지 않고 읽습니다. 그 밖에는 os.umask로 바꿨다가 되돌려야
+    하므로, 그 사이에 다른 스레드가 만드는 파일이 넓은 권한을 받지 않도록 잠깐 0o077로 바꿉니다.
+    """
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('Umask:'):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    umask = os.umask(0o077)
+    os.umask(umask)
+    return umask
+
+
+def chmod_default(fd):
+    """mkstemp로 만든 파일(0600)의 권한을 open()으로 만든 파일과 같은 0666 & ~umask로 변경"""
+    global _umask
+    if not hasattr(os, 'fchmod'):
+        return
+    if _umask is None:
+        with _umask_lock:
+            if _umask is None:
+                _umask = _read_umask()
+    os.fchmod(fd, 0o666 & ~_umask)
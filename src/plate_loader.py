@@ -0,0 +1,106 @@
+# 추출 번호판 이미지 로더 (plate_loader.py)
+#
+# 입력 폴더를 설정할 수 있고, 다음 N개 파일을 백그라운드 스레드에서 미리 읽어 디코딩하여
+# 현재 번호판을 처리하는 동안 디스크 읽기와 디코딩이 함께 진행되도록 합니다.
+# grayscale=True이면 3채널로 디코딩한 뒤 cvtColor로 줄이는 대신 바로 흑백으로 디코딩합니다.
+# 결과 캐시에 이미 있는 번호판처럼 디코딩할 필요가 없는 파일은 skip 판정 함수로 건너뛸 수 있습니다.
+# 파일 읽기와 디코딩은 실행되는 스레드(미리 읽기 스레드 포함)에서 'decode' 단계로 계측됩니다.
+
+import os
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from plate_metrics import instrument, metrics_plate
+
+
+# 기본 입력 폴더 (src/에서 실행하는 기존 스크립트 기준)
+DEFAULT_PLATE_DIR = '../extracted_plates'
+
+# iter_load가 skip 판정으로 읽지 않은 번호판의 이미지 자리에 오는 값 (필요하면 사용하는 쪽에서 load)
+NOT_LOADED = object()
+
+
+class PlateLoader:
+    """base_dir/<번호판 이름>.png를 읽는 로더
+
+    grayscale: True이면 IMREAD_GRAYSCALE로 바로 흑백 디코딩합니다. PNG의 흑백 디코딩은
+               libpng 변환을 쓰므로 cvtColor(COLOR_BGR2GRAY)와 픽셀값이 1 정도 다를 수 있습니다.
+    prefetch: iter_load에서 미리 읽어 둘 파일 수
+    threads: 미리 읽기 스레드 수 (파일 읽기와 cv2.imdecode는 GIL을 놓음)
+    """
+
+    def __init__(self, base_dir=DEFAULT_PLATE_DIR, grayscale=False, prefetch=4, threads=2):
+        self.base_dir = base_dir
+        self.grayscale = grayscale
+        self.prefetch = prefetch
+        self.threads = threads
+        self.config = {'base_dir': base_dir, 'grayscale': grayscale, 'prefetch': prefetch, 'threads': threads}
+
+    def path_for(self, plate_name):
+        """번호판 이름에 해당하는 입력 파일 경로"""
+        return os.path.join(self.base_dir, f'{plate_name}.png')
+
+    def list_names(self):
+        """입력 폴더의 번호판 이름 목록 (정렬된 순서, 폴더가 없으면 None)"""
+        if not os.path.isdir(self.base_dir):
+            return None
+        return sorted(f[:-len('.png')] for f in os.listdir(self.base_dir) if f.endswith('.png'))
+
+    @instrument('decode')
+    def load(self, plate_name):
+        """번호판 이미지를 읽어 디코딩 (파일이 없으면 FileNotFoundError, 손상되었으면 None)"""
+        data = np.fromfile(self.path_for(plate_name), dtype=np.uint8)
+        flags = cv2.IMREAD_GRAYSCALE if self.grayscale else cv2.IMREAD_COLOR
+        return cv2.imdecode(data, flags) if data.size else None
+
+    def _load_safe(self, plate_name, skip=None):
+        try:
+            if skip is not None and skip(plate_name):
+                return NOT_LOADED
+            # 미리 읽기 스레드에는 처리 중인 번호판 이름이 없으므로 decode 이벤트에 직접 붙임
+            with metrics_plate(plate_name):
+                return self.load(plate_name)
+        except OSError as e:
+            return e
+
+    def iter_load(self, plate_names, skip=None):
+        """(번호판 이름, 이미지 또는 읽기 오류)를 순서대로 yield하며 다음 prefetch개를 미리 읽음
+
+        이미지 자리에는 디코딩 결과(손상된 파일이면 None) 또는 파일 읽기 중 발생한 OSError가 옵니다.
+        skip(번호판 이름)이 참이면 디코딩하지 않고 NOT_LOADED를 돌려줍니다 (판정도 미리 읽기 스레드에서 함).
+        """
+        if self.prefetch <= 0 or self.threads <= 0:
+            for plate_name in plate_names:
+                yield plate_name, self._load_safe(plate_name, skip)
+            return
+
+        plate_names = iter(plate_names)
+        with ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='plate-loader') as executor:
+            pending = deque((plate_name, executor.submit(self._load_safe, plate_name, skip))
+                            for plate_name in itertools.islice(plate_names, self.prefetch + 1))
+            while pending:
+                plate_name, future = pending.popleft()
+                for next_name in itertools.islice(plate_names, 1):
+                    pending.append((next_name, executor.submit(self._load_safe, next_name, skip)))
+                yield plate_name, future.result()
+
+
+# 현재 연결된 로더 (기본값: 기존과 같은 폴더에서 3채널로 디코딩)
+_plate_loader = PlateLoader()
+
+
+def set_plate_loader(loader):
+    """번호판 로더 연결, 이전 로더 반환"""
+    global _plate_loader
+    previous = _plate_loader
+    _plate_loader = loader
+    return previous
+
+
+def get_plate_loader():
+    """현재 연결된 번호판 로더 반환"""
+    return _plate_loader
@@ -0,0 +1,263 @@
+import os
+import json
+import time
+import functools
+import tempfile
+import threading
+import contextlib
+import contextvars
+import tracemalloc
+
+import numpy as np
+
+from plate_fileutil import chmod_default
+
+
+# 현재 연결된 계측 recorder (None이면 계측 꺼짐: 단계 함수를 그대로 호출)
+_recorder = None
+
+# 현재 처리 중인 번호판 이름 (이벤트 라벨)
+_current_plate = contextvars.ContextVar('current_plate', default=None)
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+
+def set_metrics_recorder(recorder):
+    """계측 recorder 연결 (None이면 계측 끔), 이전 recorder 반환"""
+    global _recorder
+    previous = _recorder
+    _recorder = recorder
+    return previous
+
+
+def get_metrics_recorder():
+    """현재 연결된 계측 recorder 반환"""
+    return _recorder
+
+
+def _image_dims(args, result):
+    """인자 중 첫 번째 이미지 배열(없으면 결과)의 크기"""
+    for value in (*args, result):
+        if isinstance(value, np.ndarray):
+            return list(value.shape)
+    return None
+
+
+def instrument(stage):
+    """단계 함수 계측 데코레이터
+
+    recorder가 없으면 전역 변수 하나만 확인하고 원래 함수를 호출합니다.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder
+            if recorder is None:
+                return func(*args, **kwargs)
+            return recorder.measure(stage, func, args, kwargs)
+        return wrapper
+    return decorator
+
+
+def metrics_plate(plate_name):
+    """번호판 하나를 처리하는 동안 이벤트에 번호판 이름을 붙이고, 끝나면 exporter flush"""
+    if _recorder is None:
+        return _NULL_CONTEXT
+    return _PlateScope(_recorder, plate_name)
+
+
+class _PlateScope:
+    def __init__(self, recorder, plate_name):
+        self.recorder = recorder
+        self.plate_name = plate_name
+
+    def __enter__(self):
+        self.token = _current_plate.set(self.plate_name)
+        return self
+
+    def __exit__(self, *exc):
+        _current_plate.reset(self.token)
+        self.recorder.flush()
+        return False
+
+
+class MetricsRecorder:
+    """단계별 wall/CPU 시간, 할당 바이트, 이미지 크기를 측정하여 exporter에 전달
+
+    track_allocations가 True이면 tracemalloc으로 단계별 최대 할당량을 측정합니다
+    (NumPy 배열 할당 포함). tracemalloc 자체 비용이 크므로 기본값은 False입니다.
+    """
+
+    def __init__(self, exporters, track_allocations=False):
+        self.exporters = list(exporters)
+        self.track_allocations = track_allocations
+        if track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def measure(self, stage, func, args, kwargs):
+        if self.track_allocations:
+            start_mem, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        start_wall = time.perf_counter_ns()
+        start_cpu = time.thread_time_ns()
+
+        result = func(*args, **kwargs)
+
+        cpu_ns = time.thread_time_ns() - start_cpu
+        wall_ns = time.perf_counter_ns() - start_wall
+
+        event = {
+            'ts': time.time(),
+            'plate': _current_plate.get(),
+            'stage': stage,
+            'wall_ms': wall_ns / 1e6,
+            'cpu_ms': cpu_ns / 1e6,
+            'dims': _image_dims(args, result),
+        }
+        if self.track_allocations:
+            _, peak_mem = tracemalloc.get_traced_memory()
+            event['alloc_bytes'] = max(peak_mem - start_mem, 0)
+
+        for exporter in self.exporters:
+            exporter.record(event)
+        return result
+
+    def flush(self):
+        for exporter in self.exporters:
+            exporter.flush()
+
+    def close(self):
+        for exporter in self.exporters:
+            exporter.close()
+        if self.track_allocations:
+            tracemalloc.stop()
+
+
+class JsonLinesExporter:
+    """이벤트를 한 줄에 하나씩 JSON으로 추가 기록
+
+    줄마다 O_APPEND로 연 파일에 os.write 한 번으로 쓰므로, 여러 프로세스가 같은 파일에 추가해도
+    버퍼 경계에서 줄이 나뉘어 섞이지 않습니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+
+    def record(self, event):
+        os.write(self._fd, (json.dumps(event, ensure_ascii=False) + '\n').encode('utf-8'))
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class PrometheusExporter:
+    """단계별 누적 값을 Prometheus 텍스트 형식 파일로 기록 (node_exporter textfile collector용)
+
+    임시 파일에 쓴 뒤 rename하므로 수집기가 쓰는 중인 파일을 읽지 않습니다.
+    번호판마다 파일을 다시 쓰지 않도록, flush는 마지막 기록 후 min_interval초가 지나지 않았으면
+    남은 시간 뒤에 백그라운드 타이머로 한 번만 씁니다. close는 예약된 기록을 취소하고 바로 씁니다.
+    """
+
+    def __init__(self, path, labels=None, min_interval=5.0):
+        self.path = path
+        self.labels = dict(labels or {})
+        self.min_interval = min_interval
+        self._totals = {}
+        self._lock = threading.Lock()
+        self._last_write = None
+        self._timer = None
+
+    def record(self, event):
+        with self._lock:
+            totals = self._totals.setdefault(event['stage'], {
+                'count': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'alloc_bytes': 0, 'pixels': 0,
+            })
+            totals['count'] += 1
+            totals['wall_seconds'] += event['wall_ms'] / 1e3
+            totals['cpu_seconds'] += event['cpu_ms'] / 1e3
+            totals['alloc_bytes'] += event.get('alloc_bytes', 0)
+            if event['dims']:
+                totals['pixels'] += event['dims'][0] * (event['dims'][1] if len(event['dims']) > 1 else 1)
+
+    def _format_labels(self, stage):
+        labels = {**self.labels, 'stage': stage}
+        return ','.join(f'{key}="{value}"' for key, value in labels.items())
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                return  # 예약된 기록이 그때의 최신 값을 씀
+            wait = 0 if self._last_write is None else self._last_write + self.min_interval - time.monotonic()
+            if wait > 0:
+                self._timer = threading.Timer(wait, self._write_scheduled)
+                self._timer.daemon = True
+                self._timer.start()
+                return
+        self._write()
+
+    def _write_scheduled(self):
+        with self._lock:
+            self._timer = None
+        self._write()
+
+    def _format(self):
+        metrics = [
+            ('plate_stage_calls_total', 'counter', '단계 호출 횟수', 'count'),
+            ('plate_stage_wall_seconds_total', 'counter', '단계 누적 wall 시간', 'wall_seconds'),
+            ('plate_stage_cpu_seconds_total', 'counter', '단계 누적 CPU 시간', 'cpu_seconds'),
+            ('plate_stage_alloc_bytes_total', 'counter', '단계 누적 최대 할당 바이트', 'alloc_bytes'),
+            ('plate_stage_pixels_total', 'counter', '단계 누적 처리 픽셀 수', 'pixels'),
+        ]
+        lines = []
+        for name, kind, help_text, key in metrics:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for stage, totals in sorted(self._totals.items()):
+                lines.append(f'{name}{{{self._format_labels(stage)}}} {totals[key]}')
+        return '\n'.join(lines) + '\n'
+
+    def _write(self):
+        with self._lock:
+            text = self._format()
+            self._last_write = time.monotonic()
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix='.tmp')
+        chmod_default(fd)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
+
+    def close(self):
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        self._write()
+
+
+def create_recorder(jsonl_path=None, prom_path=None, track_allocations=False, worker_id=None):
+    """설정으로 recorder 생성 (둘 다 None이면 None)
+
+    worker_id가 있으면 Prometheus 파일을 작업 프로세스별로 나누고 worker 라벨을 붙입니다.
+    실행할 때마다 같은 파일을 덮어쓰도록 worker_id는 PID가 아닌 작업 프로세스 번호(0..workers-1)를 씁니다.
+    """
+    exporters = []
+    if jsonl_path:
+        exporters.append(JsonLinesExporter(jsonl_path))
+    if prom_path:
+        if worker_id is None:
+            exporters.append(PrometheusExporter(prom_path))
+        else:
+            root, ext = os.path.splitext(prom_path)
+            exporters.append(PrometheusExporter(f'{root}_{worker_id}{ext}', {'worker': worker_id}))
+    if not exporters:
+        return None
+    recorder = MetricsRecorder(exporters, track_allocations)
+    # 작업 프로세스에서 같은 설정으로 recorder를 다시 만들 수 있도록 보관
+    recorder.config = {'jsonl_path': jsonl_path, 'prom_path': prom_path, 'track_allocations': track_allocations}
+    return recorder
@@ -0,0 +1,260 @@
+# 선언형 번호판 처리 파이프라인 (plate_pipeline.py)
+#
+# 단계 순서와 파라미터를 코드 대신 JSON 설정 파일(../pipelines/*.json)로 기술하고,
+# 이를 실행 계획으로 컴파일하여 process_extracted_plate 대신 실행합니다.
+# 컴파일 시 결과에 쓰이지 않는 단계(가지)를 제거하고, 다른 곳에서 쓰지 않는 중간 결과는
+# 다음 단계가 제자리(in-place)로 덮어쓰도록 묶으며, 마지막으로 쓰인 중간 버퍼는 바로 풀에 반납합니다.
+# 카메라 설치 장소마다 설정 파일만 바꿔 조정된 파이프라인을 실행할 수 있습니다.
+#
+# 설정 형식:
+#   stages:  [{"id": 값 이름, "op": 연산, "inputs": [입력 값 이름, ...], "params": {...}}, ...]
+#            (입력은 앞 단계의 id 또는 원본 이미지 "original"; 정의 순서대로 실행)
+#   outputs: 결과 항목(gray, enhanced, threshold, contour_result, contours, potential_chars) → 값 이름
+#   keep:    keep_arrays일 때 결과에 추가로 담을 값 이름 목록
+#            (예: segment 단계의 (글자 배열, 경계 상자)를 인식 단계로 넘길 때)
+
+import json
+import argparse
+
+import cv2
+import numpy as np
+
+import plate_processor as pp
+from plate_metrics import instrument
+from plate_segmenter import segment_plate
+from plate_recognizer import DEFAULT_TEMPLATE_BANK, MIN_CONFIDENCE, TemplateRecognizer, get_template_bank
+from plate_buffers import take_buffer, release_buffer
+
+
+# 파이프라인 결과 항목 (save_processed_results/결과 캐시가 쓰는 이름)
+OUTPUT_SLOTS = ('gray', 'enhanced', 'threshold', 'contour_result', 'contours', 'potential_chars')
+
+
+def _pooled_like(src, channels=None):
+    shape = src.shape[:2] if channels is None else src.shape[:2] + (channels,)
+    return take_buffer(shape, src.dtype)
+
+
+@instrument('grayscale')
+def _op_grayscale(src, dst=None):
+    if src.ndim == 2:
+        return src
+    return cv2.cvtColor(src, cv2.COLOR_BGR2GRAY, dst=dst if dst is not None else _pooled_like(src))
+
+
+@instrument('contrast')
+def _op_contrast(src, dst=None, ksize=(2, 2)):
+    enhanced, tophat, blackhat = pp.enhance_contrast(src, tuple(ksize))
+    release_buffer(tophat)
+    release_buffer(blackhat)
+    return enhanced
+
+
+@instrument('equalize')
+def _op_equalize(src, dst=None):
+    return cv2.equalizeHist(src, dst=dst if dst is not None else _pooled_like(src))
+
+
+@instrument('blur')
+def _op_blur(src, dst=None, ksize=(3, 3)):
+    return cv2.GaussianBlur(src, tuple(ksize), 0, dst=dst if dst is not None else _pooled_like(src))
+
+
+@instrument('threshold')
+def _op_threshold(src, dst=None, method='gaussian', block_size=11, C=2):
+    return pp.THRESHOLD_METHODS[method][0](src, block_size, C)
+
+
+@instrument('contours')
+def _op_contours(src, dst=None, mode='external'):
+    contours, _ = cv2.findContours(src, CONTOUR_MODES[mode], cv2.CHAIN_APPROX_SIMPLE)
+    return contours, pp.compute_contour_features(contours)
+
+
+@instrument('draw_contours')
+def _op_draw_contours(src, contour_set, dst=None):
+    contours, features = contour_set
+    return pp.draw_contour_overlay(src, contours, features)
+
+
+@instrument('segment')
+def _op_segment(src, dst=None, **params):
+    # 입력은 원본 또는 흑백 번호판 (글자용 이진화는 segment_plate가 따로 함)
+    return segment_plate(src, params)
+
+
+@instrument('recognize')
+def _op_recognize(segmented, dst=None, bank=DEFAULT_TEMPLATE_BANK, min_confidence=MIN_CONFIDENCE):
+    return TemplateRecognizer(get_template_bank(bank), min_confidence).recognize(segmented[0])
+
+
+def _op_count(contour_set, dst=None):
+    return len(contour_set[0])
+
+
+def _op_char_count(contour_set, dst=None, min_area=30, max_area=2000):
+    return int(np.count_nonzero(pp.char_candidate_mask(contour_set[1], min_area, max_area)))
+
+
+CONTOUR_MODES = {'external': cv2.RETR_EXTERNAL, 'list': cv2.RETR_LIST, 'tree': cv2.RETR_TREE}
+
+# 연산 이름 → (구현 함수, 입력 개수, 첫 입력을 제자리로 덮어쓸 수 있는지)
+# 구현 함수는 (*입력, dst=None, **params) 형식이며 plate_processor의 단계 함수와 같은 결과를 냅니다.
+PIPELINE_OPS = {
+    'grayscale': (_op_grayscale, 1, False),
+    'contrast': (_op_contrast, 1, False),
+    'equalize': (_op_equalize, 1, True),
+    'blur': (_op_blur, 1, True),
+    'threshold': (_op_threshold, 1, False),
+    'contours': (_op_contours, 1, False),
+    'draw_contours': (_op_draw_contours, 2, False),
+    'segment': (_op_segment, 1, False),
+    'recognize': (_op_recognize, 1, False),
+    'count': (_op_count, 1, False),
+    'char_count': (_op_char_count, 1, False),
+}
+
+
+class _Step:
+    def __init__(self, stage_id, op, func, inputs, params):
+        self.stage_id = stage_id
+        self.op = op
+        self.func = func
+        self.inputs = inputs
+        self.params = params
+        self.fused = []       # 이 단계에 제자리로 합쳐진 뒤 단계들 [(id, 연산, 함수, 파라미터), ...]
+        self.release = []     # 이 단계 후 반납할 중간 값 이름
+
+
+class CompiledPipeline:
+    """설정을 컴파일한 실행 계획 (run(original) → {값 이름: 값})"""
+
+    def __init__(self, config):
+        self.config = config
+        self.name = config.get('name', 'pipeline')
+        self.outputs = dict(config['outputs'])
+        self.keep = list(config.get('keep', []))
+        self.steps, self.pruned = _compile(config['stages'], set(self.outputs.values()) | set(self.keep))
+
+    def run(self, original):
+        values = {'original': original}
+        for step in self.steps:
+            value = step.func(*(values[name] for name in step.inputs), **step.params)
+            if step.fused and any(value is values[name] for name in step.inputs):
+                value = value.copy()  # 입력을 그대로 돌려준 경우 입력(원본)을 덮어쓰지 않도록 복사
+            for stage_id, _, func, params in step.fused:
+                value = func(value, dst=value, **params)
+            values[step.fused[-1][0] if step.fused else step.stage_id] = value
+            for name in step.release:
+                released = values.pop(name)
+                if isinstance(released, np.ndarray):
+                    release_buffer(released)
+        return values
+
+    def execute(self, original):
+        """실행 → (결과 항목 dict, keep 값 dict)"""
+        values = self.run(original)
+        outputs = {slot: values[name] for slot, name in self.outputs.items()}
+        kept = {name: values[name] for name in self.keep}
+        return outputs, kept
+
+    def describe(self):
+        """실행 계획 설명 (단계 목록, 제거된 단계)"""
+        lines = [f"파이프라인: {self.name}"]
+        for step in self.steps:
+            ops = '+'.join([step.op] + [op for _, op, _, _ in step.fused])
+            ids = ' → '.join([step.stage_id] + [stage_id for stage_id, _, _, _ in step.fused])
+            release = f"  (반납: {', '.join(step.release)})" if step.release else ''
+            lines.append(f"  {ids} = {ops}({', '.join(step.inputs)}){release}")
+        if self.pruned:
+            lines.append(f"  제거된 단계: {', '.join(self.pruned)}")
+        return '\n'.join(lines)
+
+
+def _compile(stages, required):
+    """검증 → 안 쓰는 단계 제거 → 제자리 연산 묶기 → 중간 값 반납 시점 계산"""
+    defined = {'original'}
+    for stage in stages:
+        stage_id, op = stage['id'], stage['op']
+        if op not in PIPELINE_OPS:
+            raise ValueError(f"지원하지 않는 연산: {op} (가능: {', '.join(PIPELINE_OPS)})")
+        if stage_id in defined:
+            raise ValueError(f"중복된 단계 id: {stage_id}")
+        if len(stage['inputs']) != PIPELINE_OPS[op][1]:
+            raise ValueError(f"{stage_id}: {op} 연산의 입력은 {PIPELINE_OPS[op][1]}개여야 합니다")
+        params = stage.get('params', {})
+        if op == 'threshold' and params.get('method', 'gaussian') not in pp.THRESHOLD_METHODS:
+            raise ValueError(f"{stage_id}: 지원하지 않는 임계처리 방법 {params['method']}")
+        if op == 'contours' and params.get('mode', 'external') not in CONTOUR_MODES:
+            raise ValueError(f"{stage_id}: 지원하지 않는 윤곽선 모드 {params['mode']}")
+        for name in stage['inputs']:
+            if name not in defined:
+                raise ValueError(f"{stage_id}: 앞에서 정의되지 않은 입력 {name}")
+        defined.add(stage_id)
+    for name in required:
+        if name not in defined:
+            raise ValueError(f"정의되지 않은 출력 값: {name}")
+
+    # 1) 결과에 필요한 값에서 거슬러 올라가 쓰이는 단계만 남김
+    needed = set(required)
+    for stage in reversed(stages):
+        if stage['id'] in needed:
+            needed.update(stage['inputs'])
+    live = [stage for stage in stages if stage['id'] in needed]
+    pruned = [stage['id'] for stage in stages if stage['id'] not in needed]
+
+    consumers = {}
+    for stage in live:
+        for name in stage['inputs']:
+            consumers.setdefault(name, []).append(stage['id'])
+
+    # 2) 앞 단계 결과를 이 단계만 쓰고 결과로도 내보내지 않으면 제자리로 덮어쓰도록 묶음
+    steps = []
+    step_of = {}
+    for stage in live:
+        func, _, inplace = PIPELINE_OPS[stage['op']]
+        params = stage.get('params', {})
+        source = stage['inputs'][0]
+        previous = step_of.get(source)
+        last_id = previous and (previous.fused[-1][0] if previous.fused else previous.stage_id)
+        if (inplace and previous is not None and last_id == source and consumers[source] == [stage['id']]
+                and source not in required):
+            previous.fused.append((stage['id'], stage['op'], func, params))
+            step_of[stage['id']] = previous
+            continue
+        step = _Step(stage['id'], stage['op'], func, list(stage['inputs']), params)
+        steps.append(step)
+        step_of[stage['id']] = step
+
+    # 3) 값마다 마지막으로 쓰는 단계 뒤에서 반납 (결과로 내보내는 값과 원본은 제외)
+    last_use = {}
+    for index, step in enumerate(steps):
+        for name in step.inputs:
+            last_use[name] = index
+    for name, index in last_use.items():
+        if name != 'original' and name not in required:
+            steps[index].release.append(name)
+
+    return steps, pruned
+
+
+def load_pipeline(path):
+    """설정 파일을 읽어 컴파일"""
+    with open(path, encoding='utf-8') as f:
+        return compile_pipeline(json.load(f))
+
+
+def compile_pipeline(config):
+    """설정 dict를 검증하고 컴파일"""
+    missing = [slot for slot in OUTPUT_SLOTS if slot not in config.get('outputs', {})]
+    if missing:
+        raise ValueError(f"outputs에 필요한 항목이 없습니다: {', '.join(missing)}")
+    return CompiledPipeline(config)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='파이프라인 설정 검사 및 실행 계획 출력')
+    parser.add_argument('config', nargs='?', default='../pipelines/default.json', help='파이프라인 설정 파일')
+    args = parser.parse_args()
+
+    print(load_pipeline(args.config).describe())
@@ -2,658 +2,1481 @@ import cv2
 
 import numpy as np
 
-from matplotlib import pyplot as plt
+import os
+
+import argparse
+
+import functools
+
+import itertools
+
+import multiprocessing
+
+from collections import deque
+
+from concurrent.futures import ProcessPoolExecutor
+
+from multiprocessing.util import Finalize
+
+from plate_debug import emit_debug, debug_enabled, set_debug_sink, PlotDebugSink, FileDebugSink
+
+from plate_cache import DEFAULT_MAX_BYTES as DEFAULT_CACHE_MAX_BYTES, PlateResultCache
+
+from plate_metrics import instrument, metrics_plate, set_metrics_recorder, get_metrics_recorder, create_recorder
+
+from plate_writer import set_image_writer, get_image_writer, create_writer, output_ext
+
+from plate_loader import DEFAULT_PLATE_DIR, NOT_LOADED, PlateLoader, set_plate_loader, get_plate_loader
+
+from plate_buffers import BufferPool, set_buffer_pool, get_buffer_pool, take_buffer, in_buffer_scope
+
+
+# 추출된 번호판 기본 입력 폴더 (실제 입력 폴더는 연결된 로더의 base_dir)
+
+PLATE_DIR = DEFAULT_PLATE_DIR
+
+
+# 파이프라인 단계별 파라미터 (결과 캐시 키에도 포함됨)
+
+PIPELINE_PARAMS = {
+
+    'contrast_ksize': (2, 2),  # 대비 향상 구조화 요소 크기 (3x3 → 2x2로 축소)
+
+    'blur_ksize': (3, 3),      # 임계처리 전 블러 크기 (5x5 → 3x3로 축소)
+
+    'block_size': 11,          # 적응형 임계처리 블록 크기 (19 → 11로 축소)
+
+    'C': 2,                    # 적응형 임계처리 상수 (9 → 2로 축소)
+
+}
+
+
+# 설정 파일로 정의한 파이프라인 (None이면 아래 단계 함수를 고정된 순서로 실행)
+
+_plate_pipeline = None
+
+
+def set_plate_pipeline(pipeline):
+
+    """plate_pipeline.CompiledPipeline 연결 (None이면 기본 단계 순서), 이전 파이프라인 반환"""
+
+    global _plate_pipeline
+
+    previous = _plate_pipeline
+
+    _plate_pipeline = pipeline
+
+    return previous
+
+
+def get_plate_pipeline():
+
+    """현재 연결된 파이프라인 반환"""
+
+    return _plate_pipeline
+
+
+def _pooled(shape, dtype=np.uint8):
+
+    """단계 출력용 재사용 버퍼 (버퍼 scope 밖이거나 디버그 sink가 연결되어 있으면 None)
+
+    
+
+    None을 dst=로 넘기면 OpenCV가 새 배열을 할당합니다. 디버그 sink는 패널을 나중에
+
+    (FileDebugSink는 다른 스레드에서) 그리므로 재사용될 버퍼를 넘기지 않습니다.
+
+    """
+
+    if debug_enabled():
+
+        return None
+
+    return take_buffer(shape, dtype)
+
+
+def plate_path_for(plate_name):
+
+    """번호판 이름에 해당하는 입력 파일 경로"""
+
+    return get_plate_loader().path_for(plate_name)
+
+
+# load_extracted_plate에 미리 읽은 결과가 없음을 나타내는 값 (로더가 건너뛴 번호판도 같은 값)
+
+_NOT_LOADED = NOT_LOADED
+
+
+@instrument('load')
+def load_extracted_plate(plate_name, prefetched=_NOT_LOADED):
+
+    """추출된 번호판 이미지 로드
+
+    
+
+    prefetched는 PlateLoader.iter_load가 미리 읽어 둔 결과(이미지, None 또는 OSError)이며,
+
+    주어지지 않으면 연결된 로더로 지금 읽습니다.
+
+    'load' 단계는 처리 스레드가 이미지를 받기까지의 시간(미리 읽기를 쓰면 대기 시간)이고,
+
+    파일 읽기와 디코딩 시간은 로더가 실행한 스레드에서 'decode' 단계로 따로 기록됩니다.
+
+    """
+
+    plate_path = plate_path_for(plate_name)
+
+    plate_img = prefetched
+
+    if plate_img is _NOT_LOADED:
+
+        try:
+
+            plate_img = get_plate_loader().load(plate_name)
+
+        except OSError as e:
+
+            plate_img = e
+
+    if isinstance(plate_img, FileNotFoundError):
+
+        print(f"파일을 찾을 수 없습니다: {plate_path}")
+
+        return None
+
+    if isinstance(plate_img, OSError):
+
+        print(f"파일을 읽을 수 없습니다: {plate_path} ({plate_img})")
+
+        return None
+
+    if plate_img is None:
+
+        print(f"이미지를 읽을 수 없습니다 (손상된 파일): {plate_path}")
+
+        return None
+
+    print(f"번호판 이미지 로드 완료: {plate_img.shape}")
+
+    return plate_img
+
+@instrument('grayscale')
+def convert_to_grayscale(plate_img):
+
+    """번호판을 그레이스케일로 변환 (로더가 이미 흑백으로 디코딩했으면 그대로 사용)"""
+
+    
+
+    # BGR을 그레이스케일로 변환
+
+    if plate_img.ndim == 2:
+
+        gray_plate = plate_img
+
+    else:
+
+        gray_plate = cv2.cvtColor(plate_img, cv2.COLOR_BGR2GRAY, dst=_pooled(plate_img.shape[:2]))
+
+    
+
+    # 결과 비교 시각화 (디버그 sink가 연결된 경우에만)
+
+    emit_debug('grayscale', lambda: ((12, 4), [
+
+        (cv2.cvtColor(plate_img, cv2.COLOR_BGR2RGB if plate_img.ndim == 3 else cv2.COLOR_GRAY2RGB),
+
+         'Original Extracted Plate', None),
+
+        (gray_plate, 'Grayscale Plate', 'gray'),
+
+    ]))
+
+    
+
+    return gray_plate
+@functools.lru_cache(maxsize=None)
+
+def get_structuring_element(shape, ksize):
+
+    """구조화 요소 생성 (같은 모양/크기는 한 번만 만들고 재사용)"""
+
+    kernel = cv2.getStructuringElement(shape, ksize)
+
+    kernel.flags.writeable = False  # 캐시된 커널이 변경되지 않도록 보호
+
+    return kernel
+
+
+def enhance_contrast(gray_plate, ksize=(2, 2)):
+
+    """Top Hat/Black Hat 대비 향상을 한 번에 계산 (enhanced, tophat, blackhat 반환)
+
+    
+
+    morphologyEx를 두 번 호출하는 것과 결과는 비트 단위로 같지만, 열림/닫힘 결과
+
+    버퍼를 그대로 tophat/blackhat 출력으로 재사용하고 향상 결과도 한 버퍼에서
+
+    제자리(in-place)로 계산하여 중간 배열 할당을 없앱니다.
+
+    """
+
+    
+
+    kernel = get_structuring_element(cv2.MORPH_RECT, ksize)
+
+    
+
+    # 열림(침식 → 팽창)과 닫힘(팽창 → 침식)을 각각 하나의 버퍼에서 계산
+
+    tophat = cv2.erode(gray_plate, kernel, dst=_pooled(gray_plate.shape))
+
+    cv2.dilate(tophat, kernel, dst=tophat)
+
+    blackhat = cv2.dilate(gray_plate, kernel, dst=_pooled(gray_plate.shape))
+
+    cv2.erode(blackhat, kernel, dst=blackhat)
+
+    
+
+    # Top Hat = 원본 - 열림, Black Hat = 닫힘 - 원본 (포화 연산)
+
+    cv2.subtract(gray_plate, tophat, dst=tophat)
+
+    cv2.subtract(blackhat, gray_plate, dst=blackhat)
+
+    
+
+    # 원본 + Top Hat - Black Hat 을 하나의 출력 버퍼에 누적
+
+    enhanced = cv2.add(gray_plate, tophat, dst=_pooled(gray_plate.shape))
+
+    cv2.subtract(enhanced, blackhat, dst=enhanced)
+
+    
+
+    return enhanced, tophat, blackhat
+
+
+@instrument('contrast')
+def maximize_contrast(gray_plate, ksize=(2, 2)):
+
+    """번호판의 글자 대비 최대화"""
+
+    
+
+    # 모폴로지 연산용 구조화 요소는 2x2 (3x3 → 2x2로 축소), Top Hat은 밝은 세부사항(흰 배경),
+
+    # Black Hat은 어두운 세부사항(검은 글자)을 강조
+
+    enhanced, tophat, blackhat = enhance_contrast(gray_plate, ksize)
+
+    
+
+    # 추가: 히스토그램 균등화로 대비 더욱 향상
+
+    cv2.equalizeHist(enhanced, dst=enhanced)
+
+    
+
+    # 결과 비교 (디버그 sink가 연결된 경우에만)
+
+    emit_debug('contrast', lambda: ((15, 4), [
+
+        (gray_plate, 'Original Gray', 'gray'),
+
+        (tophat, 'Top Hat', 'gray'),
+
+        (blackhat, 'Black Hat', 'gray'),
+
+        (enhanced, 'Enhanced Contrast', 'gray'),
+
+    ]))
+
+    
+
+    return enhanced
+
+
+
+def _threshold_gaussian(blurred, block_size, C):
+
+    """가우시안 가중 평균 기반 적응형 임계처리"""
+
+    return cv2.adaptiveThreshold(
+
+        blurred,
+
+        maxValue=255,
+
+        adaptiveMethod=cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+
+        thresholdType=cv2.THRESH_BINARY,  # BINARY_INV 대신 BINARY 사용
+
+        blockSize=block_size,
+
+        C=C,
+
+        dst=_pooled(blurred.shape)
+
+    )
+
+
+def _threshold_mean(blurred, block_size, C):
+
+    """평균 기반 적응형 임계처리 (가우시안보다 가벼움, 평균 임계처리가 필요하면 이 방법을 사용)"""
+
+    return cv2.adaptiveThreshold(
+
+        blurred,
+
+        maxValue=255,
+
+        adaptiveMethod=cv2.ADAPTIVE_THRESH_MEAN_C,
+
+        thresholdType=cv2.THRESH_BINARY,
+
+        blockSize=block_size,
+
+        C=C,
+
+        dst=_pooled(blurred.shape)
+
+    )
+
+
+def _threshold_mean_integral(blurred, block_size, C):
+
+    """적분 영상(integral image) 기반 평균 적응형 임계처리 ('mean'과 결과가 같은 비교용 구현)
+
+    
+
+    블록 크기와 상관없이 픽셀당 4번의 조회로 주변 합을 구하며, 평균으로 나누는 대신
+
+    양변에 블록 면적을 곱해 정수 비교만 수행합니다. adaptiveThreshold(ADAPTIVE_THRESH_MEAN_C)처럼
+
+    반올림한 평균과 비교하므로 결과가 비트 단위로 같습니다.
+
+    다만 OpenCV의 박스 필터도 블록 크기와 거의 무관하게 동작하므로 이 구현은 int32 중간 배열 때문에
+
+    큰 번호판에서 더 느립니다 (2400x1200, 블록 11: 약 11 ms 대 8 ms). 작은 번호판에서만 비슷하거나
+
+    약간 빠르므로 보통은 'mean'을 쓰고, 이 방법은 threshold_benchmark의 비교용으로 남겨 둡니다.
+
+    """
+
+    r = block_size // 2
+
+    height, width = blurred.shape
+
+    
+
+    # 경계는 adaptiveThreshold와 같이 복제(BORDER_REPLICATE)로 채움
+
+    padded = cv2.copyMakeBorder(blurred, r, r, r, r, cv2.BORDER_REPLICATE,
+
+                                dst=_pooled((height + 2 * r, width + 2 * r)))
+
+    integral = cv2.integral(padded, sum=_pooled((height + 2 * r + 1, width + 2 * r + 1), np.int32),
+
+                            sdepth=cv2.CV_32S)  # (h+2r+1, w+2r+1) 크기의 int32 누적합
+
+    
+
+    b = 2 * r + 1
+
+    local_sum = cv2.subtract(integral[b:b + height, b:b + width], integral[:height, b:b + width],
+
+                             dst=_pooled((height, width), np.int32))
+
+    cv2.subtract(local_sum, integral[b:b + height, :width], dst=local_sum)
+
+    cv2.add(local_sum, integral[:height, :width], dst=local_sum)
+
+    
+
+    # src > round(mean) - C  <=>  src + C - 0.5 > sum / area  <=>  (2 * src + 2 * C - 1) * area > 2 * sum
+
+    area = b * b
+
+    scaled = _pooled((height, width), np.int32)
+
+    if scaled is None:
+
+        scaled = blurred.astype(np.int32)
+
+    else:
+
+        scaled[...] = blurred
+
+    scaled *= 2 * area
+
+    scaled += (2 * C - 1) * area
+
+    cv2.add(local_sum, local_sum, dst=local_sum)
+
+    return cv2.compare(scaled, local_sum, cv2.CMP_GT, dst=_pooled((height, width)))
+
+
+def _threshold_otsu(blurred, block_size, C):
+
+    """전역 Otsu 임계처리 (block_size, C는 사용하지 않음)"""
+
+    _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=_pooled(blurred.shape))
+
+    return thresh
+
+
+# 임계처리 방법 이름 → (구현 함수, 시각화 제목)
+
+THRESHOLD_METHODS = {
+
+    'gaussian': (_threshold_gaussian, 'Adaptive Threshold'),
+
+    'mean': (_threshold_mean, 'Mean Threshold'),
+
+    'mean_integral': (_threshold_mean_integral, 'Mean (Integral) Threshold'),
+
+    'otsu': (_threshold_otsu, 'Otsu Threshold'),
+
+}
+
+
+@instrument('threshold')
+def adaptive_threshold_plate(enhanced_plate, methods=('gaussian', 'otsu'), block_size=11, C=2, blur_ksize=(3, 3)):
+
+    """번호판 전용 적응형 임계처리
+
+    
+
+    methods에 지정한 방법만 계산하여 같은 순서의 튜플로 반환합니다
+
+    (기본값은 기존과 같이 (가우시안 적응형, Otsu)).
+
+    """
+
+    
+
+    for method in methods:
+
+        if method not in THRESHOLD_METHODS:
+
+            raise ValueError(f"지원하지 않는 임계처리 방법: {method} (가능: {', '.join(THRESHOLD_METHODS)})")
+
+    
+
+    # 1단계: 가벼운 블러링 (노이즈 제거, 글자는 보존)
+
+    blurred = cv2.GaussianBlur(enhanced_plate, blur_ksize, 0, dst=_pooled(enhanced_plate.shape))  # 5x5 → 3x3로 축소
+
+    
+
+    # 2단계: 요청된 방법으로만 임계처리 (blockSize 19 → 11, C 9 → 2로 번호판에 맞춤)
+
+    results = tuple(THRESHOLD_METHODS[method][0](blurred, block_size, C) for method in methods)
+
+    
+
+    # 3단계: 결과 비교 (디버그 sink가 연결된 경우에만)
+
+    emit_debug('threshold', lambda: ((4 * (2 + len(methods)), 4), [
+
+        (enhanced_plate, 'Enhanced Plate', 'gray'),
+
+        (blurred, 'Blurred', 'gray'),
+
+    ] + [
+
+        (thresh, THRESHOLD_METHODS[method][1], 'gray') for method, thresh in zip(methods, results)
+
+    ]))
+
+    
+
+    return results
+
+
+
+
+# 윤곽선 특징 테이블 자료형 (윤곽선 1개당 1행)
+
+CONTOUR_FEATURE_DTYPE = np.dtype([
+
+    ('area', np.float64),          # cv2.contourArea와 같은 면적
+
+    ('x', np.int32), ('y', np.int32),
+
+    ('w', np.int32), ('h', np.int32),  # cv2.boundingRect와 같은 경계 사각형
+
+    ('cx', np.float64), ('cy', np.float64),  # 무게중심 (면적이 0이면 nan)
+
+    ('aspect_ratio', np.float64),  # w / h
+
+])
+
+
+def compute_contour_features(contours):
+
+    """모든 윤곽선의 면적/경계 사각형/무게중심/비율을 한 번에 계산한 구조화 배열 반환
+
+    
+
+    윤곽선 점들을 하나의 배열로 이어 붙인 뒤 reduceat으로 윤곽선별 합/최소/최대를
+
+    구하므로 윤곽선 개수만큼 OpenCV 함수를 반복 호출하지 않습니다.
+
+    """
+
+    
+
+    features = np.zeros(len(contours), dtype=CONTOUR_FEATURE_DTYPE)
+
+    if len(contours) == 0:
+
+        return features
+
+    
+
+    lengths = np.fromiter((len(c) for c in contours), dtype=np.intp, count=len(contours))
+
+    starts = np.zeros(len(contours), dtype=np.intp)
+
+    np.cumsum(lengths[:-1], out=starts[1:])
+
+    
+
+    points = np.concatenate(contours).reshape(-1, 2).astype(np.int64)
+
+    x, y = points[:, 0], points[:, 1]
+
+    
+
+    # 각 점의 다음 점 (윤곽선마다 마지막 점은 첫 점으로 닫힘)
+
+    next_index = np.arange(len(points)) + 1
+
+    next_index[starts + lengths - 1] = starts
+
+    x_next, y_next = x[next_index], y[next_index]
+
+    
+
+    # 신발끈 공식 (정수 연산이므로 오차 없음): cross 합 = 2 * 부호 있는 면적
+
+    cross = x * y_next - x_next * y
+
+    area2 = np.add.reduceat(cross, starts)
+
+    m10_6 = np.add.reduceat((x + x_next) * cross, starts)  # 6 * m10
+
+    m01_6 = np.add.reduceat((y + y_next) * cross, starts)  # 6 * m01
+
+    
+
+    features['area'] = np.abs(area2) / 2
+
+    
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+
+        features['cx'] = np.where(area2 != 0, m10_6 / (3 * area2), np.nan)
+
+        features['cy'] = np.where(area2 != 0, m01_6 / (3 * area2), np.nan)
+
+    
+
+    x_min = np.minimum.reduceat(x, starts)
+
+    y_min = np.minimum.reduceat(y, starts)
+
+    features['x'] = x_min
+
+    features['y'] = y_min
+
+    features['w'] = np.maximum.reduceat(x, starts) - x_min + 1
+
+    features['h'] = np.maximum.reduceat(y, starts) - y_min + 1
+
+    features['aspect_ratio'] = features['w'] / features['h']
+
+    
+
+    return features
+
+
+def char_candidate_mask(features, min_area=30, max_area=2000):
+
+    """글자 후보 윤곽선 마스크 (min_area < 면적 < max_area)"""
+
+    area = features['area']
+
+    return (area > min_area) & (area < max_area)
+
+
+# 윤곽선 시각화용 색상 (순환 사용)
+
+CONTOUR_COLORS = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0), 
+
+                  (255, 0, 255), (0, 255, 255), (128, 0, 128), (255, 165, 0)]
+
+
+def draw_bounding_rects(thresh_plate, features):
+
+    """윤곽선별 경계 사각형과 면적 정보를 그린 이미지 생성"""
+
+    
+
+    height, width = thresh_plate.shape
+
+    contour_info = np.zeros((height, width, 3), dtype=np.uint8)
+
+    
+
+    for i, (area, x, y, w, h) in enumerate(features[['area', 'x', 'y', 'w', 'h']].tolist()):
+
+    
+
+        # 경계 사각형 그리기
+
+        cv2.rectangle(contour_info, (x, y), (x+w, y+h), CONTOUR_COLORS[i % len(CONTOUR_COLORS)], 1)
+
+    
+
+        # 면적 정보 표시 (작은 글씨로)
+
+        cv2.putText(contour_info, f'A:{int(area)}', (x, y-2), 
 
-import os
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.25, (255, 255, 255), 1)
 
-def load_extracted_plate(plate_name):
+    
 
-    """추출된 번호판 이미지 로드"""
+    return contour_info
 
-    plate_path = f'../extracted_plates/{plate_name}.png'
 
-    if os.path.exists(plate_path):
+def draw_contour_overlay(thresh_plate, contours, features, dst=None):
 
-        plate_img = cv2.imread(plate_path)
+    """이진 영상 위에 윤곽선을 다른 색으로 그리고 무게중심에 번호를 표시한 컬러 이미지"""
 
-        print(f"번호판 이미지 로드 완료: {plate_img.shape}")
+    
 
-        return plate_img
+    if dst is None:
 
-    else:
+        dst = _pooled(thresh_plate.shape + (3,))
 
-        print(f"파일을 찾을 수 없습니다: {plate_path}")
+    contour_image = cv2.cvtColor(thresh_plate, cv2.COLOR_GRAY2BGR, dst=dst)
 
-        return None
+    
 
-def convert_to_grayscale(plate_img):
+    # 모든 윤곽선을 다른 색으로 그리고 무게중심에 번호 표시 (면적이 0인 윤곽선은 번호 생략)
 
-    """번호판을 그레이스케일로 변환"""
+    centroids = features[['cx', 'cy']].tolist()
 
-    
+    for i, (contour, (cx, cy)) in enumerate(zip(contours, centroids)):
 
-    # BGR을 그레이스케일로 변환
+        color = CONTOUR_COLORS[i % len(CONTOUR_COLORS)]  # 색상 순환
 
-    gray_plate = cv2.cvtColor(plate_img, cv2.COLOR_BGR2GRAY)
+        cv2.drawContours(contour_image, [contour], -1, color, 2)
 
-    
+        if cx == cx:  # nan 제외
 
-    # 결과 비교 시각화
+            cv2.putText(contour_image, str(i+1), (int(cx)-5, int(cy)+5), 
 
-    plt.figure(figsize=(12, 4))
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
 
     
 
-    plt.subplot(1, 2, 1)
+    return contour_image
 
-    plt.imshow(cv2.cvtColor(plate_img, cv2.COLOR_BGR2RGB))
 
-    plt.title('Original Extracted Plate')
+@instrument('contours')
+def find_contours_in_plate(thresh_plate, return_features=False):
 
-    plt.axis('off')
+    """번호판에서 윤곽선 검출
 
     
 
-    plt.subplot(1, 2, 2)
-
-    plt.imshow(gray_plate, cmap='gray')
+    return_features가 True이면 (contours, contour_image, features)를 반환하여
 
-    plt.title('Grayscale Plate')
+    이후 단계에서 특징 테이블을 다시 계산하지 않도록 합니다.
 
-    plt.axis('off')
+    """
 
     
 
-    plt.tight_layout()
+    # 윤곽선 검출
 
-    plt.show()
+    contours, hierarchy = cv2.findContours(
 
-    
+        thresh_plate,                    # 이진화된 번호판 이미지
 
-    return gray_plate
-def maximize_contrast(gray_plate):
+        mode=cv2.RETR_EXTERNAL,         # 가장 바깥쪽 윤곽선만 검출
 
-    """번호판의 글자 대비 최대화"""
+        method=cv2.CHAIN_APPROX_SIMPLE  # 윤곽선 단순화
+
+    )
 
     
 
-    # 모폴로지 연산용 구조화 요소 (번호판용으로 작게 설정)
+    # 윤곽선 특징을 한 번만 계산
 
-    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (2, 2))  # 3x3 → 2x2로 축소
+    features = compute_contour_features(contours)
 
     
 
-    # Top Hat: 밝은 세부사항 (흰 배경) 강조
+    # 결과 시각화용 이미지 생성 (컬러)
 
-    tophat = cv2.morphologyEx(gray_plate, cv2.MORPH_TOPHAT, kernel)
+    contour_image = draw_contour_overlay(thresh_plate, contours, features)
 
     
 
-    # Black Hat: 어두운 세부사항 (검은 글자) 강조  
+    # 결과 시각화 (디버그 sink가 연결된 경우에만)
+
+    emit_debug('contours', lambda: ((15, 5), [
 
-    blackhat = cv2.morphologyEx(gray_plate, cv2.MORPH_BLACKHAT, kernel)
+        (thresh_plate, 'Binary Plate', 'gray'),
+
+        (contour_image, f'Contours Detected: {len(contours)}', None),
+
+        (draw_bounding_rects(thresh_plate, features), 'Bounding Rectangles', None),
+
+    ]))
 
     
 
-    # 대비 향상 적용
+    # 윤곽선 정보 출력
 
-    enhanced = cv2.add(gray_plate, tophat)
+    print("=== 윤곽선 검출 결과 ===")
 
-    enhanced = cv2.subtract(enhanced, blackhat)
+    print(f"총 윤곽선 개수: {len(contours)}")
 
     
 
-    # 추가: 히스토그램 균등화로 대비 더욱 향상
+    # 윤곽선별 상세 정보는 디버그 모드에서만 출력
+
+    if debug_enabled():
 
-    enhanced = cv2.equalizeHist(enhanced)
+        for i, (area, w, h, aspect_ratio) in enumerate(features[['area', 'w', 'h', 'aspect_ratio']].tolist()):
+
+            print(f"윤곽선 {i+1}: 면적={area:.0f}, 크기=({w}×{h}), 비율={aspect_ratio:.2f}")
 
     
 
-    # 결과 비교
+    if return_features:
 
-    plt.figure(figsize=(15, 4))
+        return contours, contour_image, features
 
     
 
-    plt.subplot(1, 4, 1)
+    return contours, contour_image
+
+
 
-    plt.imshow(gray_plate, cmap='gray')
 
-    plt.title('Original Gray')
+def extract_contour_views(thresh_plate):
 
-    plt.axis('off')
+    """RETR_TREE 한 번으로 EXTERNAL/LIST/TREE 모드의 윤곽선을 모두 구함
 
     
 
-    plt.subplot(1, 4, 2)
+    TREE 결과의 계층 배열(hierarchy[i] = [next, prev, first_child, parent])에서
 
-    plt.imshow(tophat, cmap='gray')
+    부모가 없는 윤곽선만 고르면 EXTERNAL, 전체 윤곽선은 LIST(순서만 다름)와 같으므로
 
-    plt.title('Top Hat')
+    이진 영상을 다시 스캔하지 않습니다. 반환값은 모드 이름 → 전체 윤곽선 인덱스 배열입니다.
 
-    plt.axis('off')
+    """
 
     
 
-    plt.subplot(1, 4, 3)
+    contours, hierarchy = cv2.findContours(thresh_plate, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
 
-    plt.imshow(blackhat, cmap='gray')
+    
+
+    all_index = np.arange(len(contours))
+
+    if len(contours) == 0:
+
+        external_index = all_index
 
-    plt.title('Black Hat')
+    else:
 
-    plt.axis('off')
+        external_index = np.flatnonzero(hierarchy[0, :, 3] == -1)
 
     
 
-    plt.subplot(1, 4, 4)
+    views = {
 
-    plt.imshow(enhanced, cmap='gray')
+        'EXTERNAL': external_index,
 
-    plt.title('Enhanced Contrast')
+        'LIST': all_index,
 
-    plt.axis('off')
+        'TREE': all_index,
 
-    
+    }
+
+    return contours, hierarchy, views
 
-    plt.tight_layout()
 
-    plt.show()
+def compare_contour_modes(thresh_plate):
+
+    """다양한 윤곽선 검출 모드 비교"""
 
     
 
-    return enhanced
+    # 한 번의 윤곽선 검출과 특징 계산으로 모든 모드 결과 생성
 
-def adaptive_threshold_plate(enhanced_plate):
+    contours, _, views = extract_contour_views(thresh_plate)
 
-    """번호판 전용 적응형 임계처리"""
+    features = compute_contour_features(contours)
 
     
 
-    # 1단계: 가벼운 블러링 (노이즈 제거, 글자는 보존)
+    mode_contours = []
 
-    blurred = cv2.GaussianBlur(enhanced_plate, (3, 3), 0)  # 5x5 → 3x3로 축소
+    for mode_name, index in views.items():
 
-    
+        view_contours = [contours[i] for i in index]
 
-    # 2단계: 번호판 최적화 적응형 임계처리
+        mode_contours.append((mode_name, view_contours))
 
-    thresh_adaptive = cv2.adaptiveThreshold(
+        prepare_for_next_step(view_contours, thresh_plate, features[index])
 
-        blurred,
+    
 
-        maxValue=255,
+    def build_panels():
 
-        adaptiveMethod=cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+        panels = []
 
-        thresholdType=cv2.THRESH_BINARY,  # BINARY_INV 대신 BINARY 사용
+        for mode_name, view_contours in mode_contours:
 
-        blockSize=11,  # 19 → 11로 축소 (번호판 크기에 맞춤)
+            result_img = cv2.cvtColor(thresh_plate, cv2.COLOR_GRAY2BGR)
 
-        C=2           # 9 → 2로 축소 (세밀한 조정)
+            cv2.drawContours(result_img, view_contours, -1, (0, 255, 0), 1)
 
-    )
+            panels.append((result_img, f'{mode_name}: {len(view_contours)} contours', None))
+
+        return (15, 5), panels
 
     
 
-    # 3단계: Otsu 임계처리와 비교
+    # 모드별 결과 시각화 (디버그 sink가 연결된 경우에만)
 
-    _, thresh_otsu = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    emit_debug('contour_modes', build_panels)
 
     
 
-    # 4단계: 결과 비교
+    return {mode_name: len(view_contours) for mode_name, view_contours in mode_contours}
 
-    plt.figure(figsize=(16, 4))
 
-    
 
-    plt.subplot(1, 4, 1)
 
-    plt.imshow(enhanced_plate, cmap='gray')
+@instrument('prepare')
+def prepare_for_next_step(contours, thresh_plate, features=None):
 
-    plt.title('Enhanced Plate')
+    """다음 단계(글자 분석)를 위한 기본 정보 준비 (features가 있으면 재사용)"""
+
+    
 
-    plt.axis('off')
+    print("=== 다음 단계 준비 ===")
 
     
 
-    plt.subplot(1, 4, 2)
+    # 윤곽선이 충분히 검출되었는지 확인
+
+    if len(contours) < 5:
+
+        print("윤곽선이 적게 검출되었습니다. 전처리 단계를 재검토하세요.")
+
+    elif len(contours) > 20:
 
-    plt.imshow(blurred, cmap='gray')
+        print("윤곽선이 너무 많이 검출되었습니다. 노이즈 제거가 필요할 수 있습니다.")
 
-    plt.title('Blurred')
+    else:
 
-    plt.axis('off')
+        print("적절한 수의 윤곽선이 검출되었습니다.")
 
     
 
-    plt.subplot(1, 4, 3)
+    # 잠재적 글자 후보 개수 추정
+
+    if features is None:
+
+        features = compute_contour_features(contours)
 
-    plt.imshow(thresh_adaptive, cmap='gray')
+    potential_chars = int(np.count_nonzero(char_candidate_mask(features, 30, 2000)))  # 글자 크기 범위 추정
 
-    plt.title('Adaptive Threshold')
+    
 
-    plt.axis('off')
+    print(f"잠재적 글자 후보: {potential_chars}개")
 
     
 
-    plt.subplot(1, 4, 4)
+    return potential_chars
+
+
+# 단계별 저장 파일 접미사 (save_processed_results 저장 순서와 동일)
+
+PROCESSED_SUFFIXES = ('1_gray', '2_enhanced', '3_threshold', '4_contours')
+
+
+def processed_result_paths(plate_name, save_dir='../processed_plates', ext=None):
+
+    """번호판의 단계별 저장 파일 경로 목록 (ext가 없으면 현재 writer의 저장 형식)"""
+
+    ext = output_ext() if ext is None else ext
 
-    plt.imshow(thresh_otsu, cmap='gray')
+    return [f'{save_dir}/{plate_name}_{suffix}{ext}' for suffix in PROCESSED_SUFFIXES]
 
-    plt.title('Otsu Threshold')
 
-    plt.axis('off')
+@instrument('save')
+def save_processed_results(plate_name, gray_plate, enhanced_plate, thresh_plate, contour_result):
+
+    """처리된 번호판 이미지들을 체계적으로 저장
 
     
 
-    plt.tight_layout()
+    image writer(plate_writer)가 연결되어 있으면 그 형식/압축 수준으로 저장하며,
 
-    plt.show()
+    AsyncImageWriter이면 큐에 넣고 바로 반환하여 인코딩과 디스크 쓰기를 기다리지 않습니다.
+
+    """
 
     
 
-    return thresh_adaptive, thresh_otsu
+    # 저장 폴더 생성
 
+    save_dir = '../processed_plates'
 
-def find_contours_in_plate(thresh_plate):
+    if not os.path.exists(save_dir):
 
-    """번호판에서 윤곽선 검출"""
+        os.makedirs(save_dir)
 
     
 
-    # 윤곽선 검출
+    # 각 단계별 결과 저장
 
-    contours, hierarchy = cv2.findContours(
+    images = (gray_plate, enhanced_plate, thresh_plate, contour_result)
 
-        thresh_plate,                    # 이진화된 번호판 이미지
+    writer = get_image_writer()
 
-        mode=cv2.RETR_EXTERNAL,         # 가장 바깥쪽 윤곽선만 검출
+    # 저장이 끝나기 전에 반환하는 writer에는 풀 버퍼 대신 복사본을 넘김 (scope가 끝나면 버퍼가 재사용됨)
 
-        method=cv2.CHAIN_APPROX_SIMPLE  # 윤곽선 단순화
+    if writer is not None and writer.retains_images and in_buffer_scope():
 
-    )
+        images = tuple(image.copy() for image in images)
+
+    for path, image in zip(processed_result_paths(plate_name, save_dir), images):
+
+        if writer is None:
+
+            cv2.imwrite(path, image)
+
+        else:
+
+            writer.write(path, image)
 
     
 
-    # 결과 시각화용 이미지 생성 (컬러)
+    print(f"처리 결과 저장 완료: {save_dir}/{plate_name}_*{output_ext()}")
 
-    height, width = thresh_plate.shape
+def process_extracted_plate(plate_name, keep_arrays=True, cache=None, prefetched=_NOT_LOADED):
 
-    contour_image = cv2.cvtColor(thresh_plate, cv2.COLOR_GRAY2BGR)
+    """추출된 번호판의 완전한 처리 파이프라인
 
     
 
-    # 모든 윤곽선을 다른 색으로 그리기
+    keep_arrays가 False이면 단계별 이미지 배열은 버리고 요약 정보만 반환합니다.
+
+    cache(PlateResultCache)가 주어지면 입력 바이트와 PIPELINE_PARAMS가 같은 경우
+
+    디코딩/연산 없이 저장된 결과를 반환합니다 (keep_arrays이고 파이프라인에 keep 출력이 있으면 다시 계산).
+
+    계측 recorder가 연결되어 있으면 단계별 측정값에 번호판 이름이 붙습니다.
 
-    colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0), 
+    prefetched는 로더가 미리 읽어 둔 이미지입니다.
 
-              (255, 0, 255), (0, 255, 255), (128, 0, 128), (255, 165, 0)]
+    버퍼 풀이 연결되어 있고 keep_arrays가 False이면 단계 출력 배열을 풀에서 꺼내 쓰고
+
+    처리가 끝나면 반납하므로, 같은 크기의 번호판을 계속 처리할 때 새 배열을 할당하지 않습니다.
+
+    """
 
     
 
-    for i, contour in enumerate(contours):
+    with metrics_plate(plate_name):
 
-        color = colors[i % len(colors)]  # 색상 순환
+        pool = get_buffer_pool()
 
-        cv2.drawContours(contour_image, [contour], -1, color, 2)
+        if pool is None or keep_arrays:
 
-        
+            return _run_plate_pipeline(plate_name, keep_arrays, cache, prefetched)
 
-        # 윤곽선 번호 표시
+        with pool.scope():
 
-        M = cv2.moments(contour)
+            return _run_plate_pipeline(plate_name, keep_arrays, cache, prefetched)
 
-        if M["m00"] != 0:
 
-            cx = int(M["m10"] / M["m00"])
+def cache_params():
 
-            cy = int(M["m01"] / M["m00"])
+    """결과 캐시 키에 넣는 파라미터 (흑백 바로 디코딩은 결과가 조금 다르므로 키에 포함)"""
 
-            cv2.putText(contour_image, str(i+1), (cx-5, cy+5), 
+    params = PIPELINE_PARAMS if _plate_pipeline is None else {'pipeline': _plate_pipeline.config}
 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+    if get_plate_loader().grayscale:
 
-    
+        return {**params, 'gray_decode': True}
+
+    return params
 
-    # 결과 시각화
 
-    plt.figure(figsize=(15, 5))
+def _skip_cached(cache):
+
+    """결과 캐시에 항목이 있는 번호판은 로더가 미리 디코딩하지 않도록 하는 판정 함수 (cache가 없으면 None)
 
     
 
-    plt.subplot(1, 3, 1)
+    캐시 적중 시 디코딩을 건너뛰는 동작을 미리 읽기에서도 유지합니다. 판정 후 항목이 지워지면
+
+    _run_plate_pipeline이 그때 번호판을 읽습니다.
+
+    """
+
+    if cache is None:
+
+        return None
+
+    params = cache_params()
+
+    return lambda plate_name: cache.contains(cache.make_key(plate_path_for(plate_name), params))
+
+
+def _run_plate_pipeline(plate_name, keep_arrays, cache, prefetched=_NOT_LOADED):
 
-    plt.imshow(thresh_plate, cmap='gray')
+    """process_extracted_plate의 단계별 처리 본문"""
 
-    plt.title('Binary Plate')
+    
 
-    plt.axis('off')
+    print(f"=== {plate_name} 처리 시작 ===")
 
     
 
-    plt.subplot(1, 3, 2)
+    # 0단계: 결과 캐시 조회
+
+    cache_key = None
+
+    # 파이프라인의 keep 출력은 캐시에 저장하지 않으므로, 배열까지 돌려줄 때는 조회하지 않고 다시 계산
 
-    plt.imshow(contour_image)
+    # (캐시 상태에 따라 결과의 키가 달라지지 않도록 함, 저장은 요약만 필요한 호출을 위해 그대로 함)
 
-    plt.title(f'Contours Detected: {len(contours)}')
+    returns_kept = keep_arrays and _plate_pipeline is not None and bool(_plate_pipeline.keep)
 
-    plt.axis('off')
+    if cache is not None and os.path.exists(plate_path_for(plate_name)):
+
+        cache_key = cache.make_key(plate_path_for(plate_name), cache_params())
 
     
 
-    # 윤곽선 정보 표시
+        # 저장된 결과 파일이 없으면 다시 쓰기 위해 배열까지 읽음
 
-    plt.subplot(1, 3, 3)
+        writer = get_image_writer()
 
-    contour_info = np.zeros((height, width, 3), dtype=np.uint8)
+        output_exists = os.path.exists if writer is None else writer.exists
+
+        outputs_missing = not all(output_exists(path) for path in processed_result_paths(plate_name))
+
+        cached = None if returns_kept else cache.get(cache_key, plate_name, keep_arrays or outputs_missing)
 
     
 
-    for i, contour in enumerate(contours):
+        if cached is not None:
 
-        area = cv2.contourArea(contour)
+            if keep_arrays:
 
-        x, y, w, h = cv2.boundingRect(contour)
+                # 원본은 캐시에 저장하지 않으므로 다시 읽음
 
-        
+                cached['original'] = load_extracted_plate(plate_name, prefetched)
 
-        # 경계 사각형 그리기
+            if outputs_missing:
 
-        cv2.rectangle(contour_info, (x, y), (x+w, y+h), colors[i % len(colors)], 1)
+                save_processed_results(plate_name, cached['gray'], cached['enhanced'],
 
-        
+                                       cached['threshold'], cached['contour_result'])
 
-        # 면적 정보 표시 (작은 글씨로)
+                if not keep_arrays:
 
-        cv2.putText(contour_info, f'A:{int(area)}', (x, y-2), 
+                    cached = {key: cached[key] for key in ('name', 'contours', 'potential_chars')}
 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.25, (255, 255, 255), 1)
+            print(f"캐시 적중 - 검출된 윤곽선: {cached['contours']}개, 잠재적 글자: {cached['potential_chars']}개")
+
+            return cached
 
     
 
-    plt.imshow(contour_info)
+    # 1단계: 이미지 로드
+
+    plate_img = load_extracted_plate(plate_name, prefetched)
 
-    plt.title('Bounding Rectangles')
+    if plate_img is None:
 
-    plt.axis('off')
+        return None
 
     
 
-    plt.tight_layout()
+    kept = {}
 
-    plt.show()
+    if _plate_pipeline is not None:
 
-    
+        # 2~5, 7단계: 설정 파일로 정의한 파이프라인 실행 (디버그 시각화 없음)
 
-    # 윤곽선 정보 출력
+        outputs, kept = _plate_pipeline.execute(plate_img)
 
-    print("=== 윤곽선 검출 결과 ===")
+        gray_plate, enhanced_plate = outputs['gray'], outputs['enhanced']
 
-    print(f"총 윤곽선 개수: {len(contours)}")
+        thresh_plate, contour_result = outputs['threshold'], outputs['contour_result']
+
+        contour_count, potential_chars = outputs['contours'], outputs['potential_chars']
 
     
 
-    for i, contour in enumerate(contours):
+        # 6단계: 결과 저장
 
-        area = cv2.contourArea(contour)
+        save_processed_results(plate_name, gray_plate, enhanced_plate, thresh_plate, contour_result)
 
-        x, y, w, h = cv2.boundingRect(contour)
+    else:
 
-        aspect_ratio = w / h if h > 0 else 0
+        # 2단계: 그레이스케일 변환
 
-        print(f"윤곽선 {i+1}: 면적={area:.0f}, 크기=({w}×{h}), 비율={aspect_ratio:.2f}")
+        gray_plate = convert_to_grayscale(plate_img)
 
     
 
-    return contours, contour_image
+        # 3단계: 대비 최대화
 
+        enhanced_plate = maximize_contrast(gray_plate, PIPELINE_PARAMS['contrast_ksize'])
 
-def compare_contour_modes(thresh_plate):
+    
 
-    """다양한 윤곽선 검출 모드 비교"""
+        # 4단계: 적응형 임계처리
 
-    
+        thresh_plate, = adaptive_threshold_plate(enhanced_plate, methods=('gaussian',),
 
-    # 여러 모드로 윤곽선 검출
+                                                 block_size=PIPELINE_PARAMS['block_size'],
 
-    modes = [
+                                                 C=PIPELINE_PARAMS['C'],
 
-        (cv2.RETR_EXTERNAL, "EXTERNAL"),
+                                                 blur_ksize=PIPELINE_PARAMS['blur_ksize'])
 
-        (cv2.RETR_LIST, "LIST"), 
+    
+
+        # 5단계: 윤곽선 검출
 
-        (cv2.RETR_TREE, "TREE")
+        contours, contour_result, features = find_contours_in_plate(thresh_plate, return_features=True)
 
-    ]
+        contour_count = len(contours)
 
     
 
-    plt.figure(figsize=(15, 5))
+        # 6단계: 결과 저장
+
+        save_processed_results(plate_name, gray_plate, enhanced_plate, thresh_plate, contour_result)
 
     
 
-    for i, (mode, mode_name) in enumerate(modes):
+        # 7단계: 처리 결과 요약
 
-        contours, _ = cv2.findContours(thresh_plate, mode, cv2.CHAIN_APPROX_SIMPLE)
+        potential_chars = prepare_for_next_step(contours, thresh_plate, features)
 
-        
+    print(f"처리 완료 - 검출된 윤곽선: {contour_count}개, 잠재적 글자: {potential_chars}개")
 
-        result_img = cv2.cvtColor(thresh_plate, cv2.COLOR_GRAY2BGR)
+    
 
-        cv2.drawContours(result_img, contours, -1, (0, 255, 0), 1)
+    result = {
 
-        
+        'name': plate_name,
 
-        plt.subplot(1, 3, i+1)
+        'contours': contour_count,
 
-        plt.imshow(result_img)
+        'potential_chars': potential_chars
 
-        plt.title(f'{mode_name}: {len(contours)} contours')
+    }
 
-        plt.axis('off')
-        prepare_for_next_step(contours, thresh_plate)
     
 
-    plt.tight_layout()
+    arrays = {
+
+        'original': plate_img,
+
+        'gray': gray_plate,
 
-    plt.show()
+        'enhanced': enhanced_plate,
 
+        'threshold': thresh_plate,
 
-def prepare_for_next_step(contours, thresh_plate):
+        'contour_result': contour_result
 
-    """다음 단계(글자 분석)를 위한 기본 정보 준비"""
+    }
 
     
 
-    print("=== 다음 단계 준비 ===")
+    if cache_key is not None:
+
+        cache.put(cache_key, {**result, **arrays})
 
     
 
-    # 윤곽선이 충분히 검출되었는지 확인
+    if keep_arrays:
 
-    if len(contours) < 5:
+        result.update(arrays)
 
-        print("윤곽선이 적게 검출되었습니다. 전처리 단계를 재검토하세요.")
+        result.update(kept)
 
-    elif len(contours) > 20:
+    
 
-        print("윤곽선이 너무 많이 검출되었습니다. 노이즈 제거가 필요할 수 있습니다.")
+    return result
 
-    else:
 
-        print("적절한 수의 윤곽선이 검출되었습니다.")
+
+# 배치 처리
+
+def list_plate_names(plate_dir=None):
+
+    """처리할 번호판 이름 목록 (정렬된 순서, plate_dir가 없으면 연결된 로더의 입력 폴더)"""
 
     
 
-    # 잠재적 글자 후보 개수 추정
+    loader = get_plate_loader() if plate_dir is None else PlateLoader(plate_dir)
 
-    potential_chars = 0
+    plate_names = loader.list_names()
 
-    for contour in contours:
+    
 
-        area = cv2.contourArea(contour)
+    if plate_names is None:
 
-        if 30 < area < 2000:  # 글자 크기 범위 추정
+        print(f"폴더를 찾을 수 없습니다: {loader.base_dir}")
 
-            potential_chars += 1
+        return []
 
     
 
-    print(f"잠재적 글자 후보: {potential_chars}개")
+    if len(plate_names) == 0:
+
+        print("처리할 번호판 이미지가 없습니다.")
 
     
 
-    return potential_chars
+    return plate_names
 
 
-def save_processed_results(plate_name, gray_plate, enhanced_plate, thresh_plate, contour_result):
+def _init_batch_worker(metrics_config=None, writer_config=None, loader_config=None, buffer_pool=False,
+                       pipeline_config=None, worker_counter=None):
 
-    """처리된 번호판 이미지들을 체계적으로 저장"""
+    """작업 프로세스 초기화: 워커에서는 GUI 창을 띄우지 않도록 헤드리스로 설정하고,
 
-    
+    메인 프로세스에 계측이 켜져 있거나 image writer가 연결되어 있으면 같은 설정으로 워커별로 생성"""
 
-    # 저장 폴더 생성
+    set_debug_sink(None)
 
-    save_dir = '../processed_plates'
+    set_buffer_pool(BufferPool() if buffer_pool else None)
 
-    if not os.path.exists(save_dir):
+    if pipeline_config is not None:
 
-        os.makedirs(save_dir)
+        from plate_pipeline import compile_pipeline
 
-    
+        set_plate_pipeline(compile_pipeline(pipeline_config))
 
-    # 각 단계별 결과 저장
+    if loader_config is not None:
 
-    cv2.imwrite(f'{save_dir}/{plate_name}_1_gray.png', gray_plate)
+        set_plate_loader(PlateLoader(**loader_config))
 
-    cv2.imwrite(f'{save_dir}/{plate_name}_2_enhanced.png', enhanced_plate)  
+    recorder = None
 
-    cv2.imwrite(f'{save_dir}/{plate_name}_3_threshold.png', thresh_plate)
+    if metrics_config is not None:
 
-    cv2.imwrite(f'{save_dir}/{plate_name}_4_contours.png', contour_result)
+        # 작업 프로세스 번호(0..workers-1)로 Prometheus 파일을 나누어, 실행할 때마다 같은 파일을 덮어씀
 
-    
+        with worker_counter.get_lock():
 
-    print(f"처리 결과 저장 완료: {save_dir}/{plate_name}_*.png")
+            worker_index = worker_counter.value
 
-def process_extracted_plate(plate_name):
+            worker_counter.value += 1
 
-    """추출된 번호판의 완전한 처리 파이프라인"""
+        recorder = create_recorder(**metrics_config, worker_id=worker_index)
 
-    
+    set_metrics_recorder(recorder)
 
-    print(f"=== {plate_name} 처리 시작 ===")
+    if recorder is not None:
 
-    
+        # 작업 프로세스는 atexit 처리를 하지 않고 끝나므로 multiprocessing 종료 처리에서 마지막 누적값을 기록
 
-    # 1단계: 이미지 로드
+        Finalize(recorder, recorder.close, exitpriority=10)
 
-    plate_img = load_extracted_plate(plate_name)
+    writer = None if writer_config is None else create_writer(**writer_config)
 
-    if plate_img is None:
+    set_image_writer(writer)
 
-        return None
+    if writer is not None:
 
-    
+        # 묶음마다 flush하지 않는 writer(ContainerWriter)는 작업 프로세스가 끝날 때 남은 배열을 저장
 
-    # 2단계: 그레이스케일 변환
+        Finalize(writer, writer.close, exitpriority=10)
 
-    gray_plate = convert_to_grayscale(plate_img)
 
-    
+def _process_plate_safe(plate_name, keep_arrays=True, cache=None, prefetched=_NOT_LOADED):
 
-    # 3단계: 대비 최대화
+    """한 번호판 처리 (손상된 파일 등의 예외가 배치 전체를 중단시키지 않도록 보호)"""
 
-    enhanced_plate = maximize_contrast(gray_plate)
+    try:
 
-    
+        return plate_name, process_extracted_plate(plate_name, keep_arrays, cache, prefetched)
 
-    # 4단계: 적응형 임계처리
+    except Exception as e:
 
-    thresh_plate, _ = adaptive_threshold_plate(enhanced_plate)
+        print(f"번호판 처리 실패: {plate_name} ({e})")
+
+        return plate_name, None
 
-    
 
-    # 5단계: 윤곽선 검출
+def _process_plate_chunk(plate_names, keep_arrays, cache=None):
 
-    contours, contour_result = find_contours_in_plate(thresh_plate)
+    """작업 프로세스에서 번호판 묶음을 순서대로 처리
 
     
 
-    # 6단계: 결과 저장
+    묶음을 돌려주기 전에 writer의 대기 중인 저장을 마치므로, 결과를 받은 시점에는 파일이 모두 저장되어 있습니다.
+
+    단, flush_per_batch가 False인 writer(ContainerWriter)는 묶음마다 파일이 생기지 않도록 크기 한도를
+
+    넘거나 작업 프로세스가 끝날 때 저장합니다.
+
+    """
+
+    results = [_process_plate_safe(plate_name, keep_arrays, cache, prefetched)
+
+               for plate_name, prefetched in get_plate_loader().iter_load(plate_names, _skip_cached(cache))]
+
+    writer = get_image_writer()
+
+    if writer is None or writer.flush_per_batch:
+
+        _flush_image_writer()
+
+    return results
+
+
+def _flush_image_writer():
+
+    """연결된 writer의 대기 중인 저장을 마치고 저장 오류 목록 반환"""
+
+    writer = get_image_writer()
+
+    return [] if writer is None else writer.flush()
+
 
-    save_processed_results(plate_name, gray_plate, enhanced_plate, thresh_plate, contour_result)
+def iter_process_plates(workers=1, chunksize=1, keep_arrays=False, cache=None):
+
+    """extracted_plates 폴더의 번호판을 하나씩 처리하여 결과를 순서대로 yield
 
     
 
-    # 7단계: 처리 결과 요약
+    기본적으로 요약 정보(name, contours, potential_chars)만 돌려주므로 폴더 크기와
+
+    상관없이 메모리 사용량이 일정합니다. 병렬 처리 시에도 동시에 진행 중인 묶음을
 
-    potential_chars = prepare_for_next_step(contours, thresh_plate)
+    workers의 2배로 제한하여 소비자가 느려도 결과가 쌓이지 않습니다.
 
-    print(f"처리 완료 - 검출된 윤곽선: {len(contours)}개, 잠재적 글자: {potential_chars}개")
+    """
 
     
 
-    return {
+    plate_names = list_plate_names()
 
-        'original': plate_img,
+    
 
-        'gray': gray_plate, 
+    if workers <= 1:
 
-        'enhanced': enhanced_plate,
+        # 현재 번호판을 처리하는 동안 로더가 다음 파일들을 미리 읽음
 
-        'threshold': thresh_plate,
+        for plate_name, prefetched in get_plate_loader().iter_load(plate_names, _skip_cached(cache)):
 
-        'contours': len(contours),
+            _, result = _process_plate_safe(plate_name, keep_arrays, cache, prefetched)
 
-        'potential_chars': potential_chars,
+            if result:
 
-        'contour_result': contour_result
+                yield result
 
-    }
+        _flush_image_writer()
 
-# 배치 처리
+        return
 
-def batch_process_plates():
+    
 
-    """extracted_plates 폴더의 모든 번호판 처리"""
+    chunks = iter([plate_names[i:i + chunksize] for i in range(0, len(plate_names), chunksize)])
 
     
 
-    plate_dir = '../extracted_plates'
+    recorder = get_metrics_recorder()
+
+    metrics_config = getattr(recorder, 'config', None)
+
+    writer_config = getattr(get_image_writer(), 'config', None)
 
-    if not os.path.exists(plate_dir):
+    
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
 
-        print(f"폴더를 찾을 수 없습니다: {plate_dir}")
+                             initargs=(metrics_config, writer_config, get_plate_loader().config,
+                                       get_buffer_pool() is not None,
+                                       getattr(_plate_pipeline, 'config', None),
+                                       multiprocessing.Value('i', 0))) as executor:
 
-        return {}
+        # 제출 순서대로 꺼내므로 결과 순서가 결정적
 
-        
+        pending = deque(executor.submit(_process_plate_chunk, chunk, keep_arrays, cache)
 
-    plate_files = [f for f in os.listdir(plate_dir) if f.endswith('.png')]
+                        for chunk in itertools.islice(chunks, workers * 2))
 
     
 
-    if len(plate_files) == 0:
+        while pending:
 
-        print("처리할 번호판 이미지가 없습니다.")
+            processed = pending.popleft().result()
+
+    
+
+            for chunk in itertools.islice(chunks, 1):
 
-        return {}
+                pending.append(executor.submit(_process_plate_chunk, chunk, keep_arrays, cache))
 
     
 
-    results = {}
+            for plate_name, result in processed:
+
+                if result:
+
+                    yield result
+
+
+def batch_process_plates(workers=1, chunksize=1, cache=None, keep_arrays=True):
+
+    """extracted_plates 폴더의 모든 번호판 처리
 
-    for plate_file in plate_files:
+    
+
+    workers가 2 이상이면 프로세스 풀에서 병렬로 처리하며, chunksize 단위로
+
+    작업을 묶어 전달합니다. 결과는 번호판 이름 순서로 정렬되어 반환됩니다.
+
+    keep_arrays가 False이면 요약 정보만 모으므로 버퍼 풀이 연결되어 있으면 단계 출력 버퍼를 재사용합니다.
 
-        plate_name = plate_file.replace('.png', '')
+    """
 
-        result = process_extracted_plate(plate_name)
+    
+
+    results = {}
 
-        if result:
+    for result in iter_process_plates(workers, chunksize, keep_arrays=keep_arrays, cache=cache):
 
-            results[plate_name] = result
+        results[result['name']] = result
 
     
 
@@ -661,20 +1484,82 @@ def batch_process_plates():
 
     return results
 
-plate_img = load_extracted_plate('plate_01')  # plate_01.png 로드
-
-if plate_img is not None:
-    '''
-    gray_plate = convert_to_grayscale(plate_img)
 
-    enhanced_plate = maximize_contrast(gray_plate)
 
-    thresh_adaptive, thresh_otsu = adaptive_threshold_plate(enhanced_plate)
-    contours, contour_result = find_contours_in_plate(thresh_adaptive)
-    compare_contour_modes(thresh_adaptive)
-    compare_contour_modes(thresh_otsu)
-    prepare_for_next_step(contours, thresh_adaptive)
-    save_processed_results('plate_01', gray_plate, enhanced_plate, thresh_adaptive, contour_result)
-    process_extracted_plate('plate_01')
-    '''
-    batch_process_plates()
\ No newline at end of file
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='추출된 번호판 전처리')
+    parser.add_argument('--headless', action='store_true', help='시각화 창 없이 연산만 수행')
+    parser.add_argument('--debug-dir', help='시각화 창 대신 단계별 비교 이미지를 백그라운드에서 PNG로 저장할 폴더 '
+                                            '(--workers 1에서만, 작업 프로세스는 시각화하지 않음)')
+    parser.add_argument('--workers', type=int, default=1, help='병렬 처리 프로세스 수')
+    parser.add_argument('--chunksize', type=int, default=1, help='프로세스별 작업 묶음 크기')
+    parser.add_argument('--cache-dir', help='결과 캐시 폴더 (지정 시 변경되지 않은 번호판은 재처리하지 않음)')
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_CACHE_MAX_BYTES // (1024 * 1024),
+                        help='결과 캐시 배열 최대 크기 (MB, 150x300 번호판 약 110 KB/장, 요약은 한도와 무관하게 유지)')
+    parser.add_argument('--metrics-jsonl', help='단계별 계측 이벤트를 JSON lines로 기록할 파일')
+    parser.add_argument('--metrics-prom', help='단계별 누적 계측값을 Prometheus 텍스트 형식으로 기록할 파일')
+    parser.add_argument('--metrics-alloc', action='store_true', help='단계별 할당 바이트 측정 (tracemalloc, 느림)')
+    parser.add_argument('--save-format', choices=['png', 'bmp', 'jpg', 'container'], default='png',
+                        help='결과 이미지 저장 형식 (container: 단계별 배열을 메모리 매핑 가능한 묶음 파일로 저장)')
+    parser.add_argument('--save-level', type=int, help='PNG 압축 수준(0~9) 또는 JPEG 품질(0~100)')
+    parser.add_argument('--writer-threads', type=int, default=2, help='결과 이미지 저장 스레드 수 (0이면 동기 저장)')
+    parser.add_argument('--writer-queue', type=int, default=32, help='저장 대기 큐 최대 크기')
+    parser.add_argument('--plate-dir', default=PLATE_DIR, help='추출된 번호판 입력 폴더')
+    parser.add_argument('--gray-decode', action='store_true', help='입력을 바로 흑백으로 디코딩 (cvtColor 결과와 1 정도 다를 수 있음)')
+    parser.add_argument('--prefetch', type=int, default=4, help='미리 읽어 둘 입력 파일 수 (0이면 미리 읽지 않음)')
+    parser.add_argument('--loader-threads', type=int, default=2, help='입력 미리 읽기 스레드 수')
+    parser.add_argument('--no-buffer-pool', action='store_true', help='단계 출력 버퍼를 재사용하지 않음')
+    parser.add_argument('--pipeline', help='파이프라인 설정 파일 (예: ../pipelines/default.json)')
+    args = parser.parse_args()
+
+    if args.pipeline:
+        from plate_pipeline import load_pipeline
+        set_plate_pipeline(load_pipeline(args.pipeline))
+
+    set_buffer_pool(None if args.no_buffer_pool else BufferPool())
+
+    set_plate_loader(PlateLoader(args.plate_dir, args.gray_decode, args.prefetch, args.loader_threads))
+
+    cache = PlateResultCache(args.cache_dir, args.cache_max_mb * 1024 * 1024) if args.cache_dir else None
+
+    set_metrics_recorder(create_recorder(args.metrics_jsonl, args.metrics_prom, args.metrics_alloc))
+
+    set_image_writer(create_writer(args.save_format, args.save_level, args.writer_threads, args.writer_queue))
+
+    # 기본은 기존처럼 단계별 plt.show() 창 표시, --debug-dir이면 PNG로 저장, --headless 옵션이면 연산만 수행
+    debug_sink = None
+    if args.debug_dir:
+        debug_sink = FileDebugSink(args.debug_dir)
+        set_debug_sink(debug_sink)
+    elif not args.headless:
+        set_debug_sink(PlotDebugSink())
+
+    plate_img = load_extracted_plate('plate_01')  # plate_01.png 로드
+
+    if plate_img is not None:
+        '''
+        gray_plate = convert_to_grayscale(plate_img)
+
+        enhanced_plate = maximize_contrast(gray_plate)
+
+        thresh_adaptive, thresh_otsu = adaptive_threshold_plate(enhanced_plate)
+        contours, contour_result = find_contours_in_plate(thresh_adaptive)
+        compare_contour_modes(thresh_adaptive)
+        compare_contour_modes(thresh_otsu)
+        prepare_for_next_step(contours, thresh_adaptive)
+        save_processed_results('plate_01', gray_plate, enhanced_plate, thresh_adaptive, contour_result)
+        process_extracted_plate('plate_01')
+        '''
+        # 결과 배열은 쓰지 않으므로 요약 정보만 받음 (버퍼 풀 사용)
+
+        batch_process_plates(workers=args.workers, chunksize=args.chunksize, cache=cache, keep_arrays=False)
+
+    # 남은 결과 이미지를 모두 저장한 뒤 종료
+    write_errors = get_image_writer().close()
+    if write_errors:
+        print(f"결과 이미지 저장 실패: {len(write_errors)}개")
+
+    if get_metrics_recorder() is not None:
+        get_metrics_recorder().close()
+    if debug_sink is not None:
+        print(f"디버그 이미지 저장 완료: {len(debug_sink.close())}개 ({args.debug_dir})")
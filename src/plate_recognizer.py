@@ -0,0 +1,264 @@
+# 오프라인 템플릿 매칭 글자 인식 (plate_recognizer.py)
+#
+# 글자 템플릿 묶음(../templates/glyphs.npz)을 한 번 읽어 정규화한 (K, H*W) float32 연속 배열로
+# 메모리에 두고, plate_segmenter가 만든 글자 배열 (N, H, W)을 모든 템플릿과 한 번의 행렬 곱으로
+# 정규화 상관(NCC)을 계산하여 번호판 문자열과 글자별 신뢰도를 돌려줍니다.
+# 여러 번호판은 글자 배열을 이어 붙여 한 번에 계산하므로 글자 수만큼 Python 반복을 하지 않으며,
+# 네트워크나 외부 OCR 엔진이 필요 없습니다.
+#
+# 템플릿 묶음 만들기 (저장소에는 extracted_plates/로 만든 ../templates/glyphs.npz가 들어 있음):
+#   python plate_recognizer.py build --plates            (../templates/plate_labels.json의 글자 레이블로
+#                                                         추출된 번호판을 분할하여 글자마다 템플릿 생성)
+#   python plate_recognizer.py build <글자 이미지 폴더>   (파일 이름: <글자>_<번호>.png, 예: 가_01.png)
+#   python plate_recognizer.py build --digits            (OpenCV 내장 글꼴로 숫자 0-9 생성)
+# 인식 정확도 확인 (번호판마다 나머지 번호판으로 만든 템플릿으로 인식):
+#   python plate_recognizer.py evaluate
+
+import os
+import json
+import argparse
+
+import cv2
+import numpy as np
+
+import plate_processor as pp
+from plate_segmenter import SEGMENT_PARAMS, crop_characters, segment_plate
+
+
+# 기본 템플릿 묶음 경로
+DEFAULT_TEMPLATE_BANK = '../templates/glyphs.npz'
+
+# 번호판 이름 → 왼쪽부터 글자 상자별 레이블 목록 (지역명 '경기'처럼 위아래로 쌓인 글자는 상자 하나)
+DEFAULT_PLATE_LABELS = '../templates/plate_labels.json'
+
+# 신뢰도가 이보다 낮은 글자는 UNKNOWN_CHAR로 표시
+MIN_CONFIDENCE = 0.3
+UNKNOWN_CHAR = '?'
+
+
+def _normalize_rows(glyphs):
+    """(N, H, W) uint8 → 행마다 평균 0, 길이 1인 (N, H*W) float32 (빈 글자는 0 벡터)"""
+    rows = glyphs.reshape(len(glyphs), -1).astype(np.float32)
+    rows -= rows.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(rows, axis=1, keepdims=True)
+    np.divide(rows, norms, out=rows, where=norms > 0)
+    return rows
+
+
+class TemplateBank:
+    """글자 템플릿 (K, H, W)과 레이블 (K,) (같은 글자에 템플릿 여러 개 가능)"""
+
+    def __init__(self, glyphs, labels):
+        glyphs = np.asarray(glyphs, dtype=np.uint8)
+        if glyphs.ndim != 3 or len(glyphs) != len(labels):
+            raise ValueError('템플릿은 (K, H, W) 배열이고 레이블 수와 같아야 합니다')
+        self.glyphs = glyphs
+        self.labels = np.asarray(labels, dtype=str)
+        self.char_size = glyphs.shape[1:]
+        # 인식 때마다 다시 만들지 않도록 정규화한 템플릿 행렬을 연속 배열로 보관
+        self.matrix = np.ascontiguousarray(_normalize_rows(glyphs))
+
+    @classmethod
+    def load(cls, path=DEFAULT_TEMPLATE_BANK):
+        with np.load(path) as data:
+            return cls(data['glyphs'], data['labels'])
+
+    def save(self, path=DEFAULT_TEMPLATE_BANK):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez_compressed(path, glyphs=self.glyphs, labels=self.labels)
+
+    def scores(self, chars):
+        """글자 (N, H, W)와 모든 템플릿의 정규화 상관 (N, K), 값 범위 -1 ~ 1"""
+        if tuple(chars.shape[1:]) != tuple(self.char_size):
+            raise ValueError(f'글자 크기 {chars.shape[1:]}가 템플릿 크기 {self.char_size}와 다릅니다')
+        return _normalize_rows(chars) @ self.matrix.T
+
+
+class TemplateRecognizer:
+    """템플릿 묶음으로 분할된 글자를 인식 (recognize: 번호판 하나, recognize_batch: 여러 번호판)"""
+
+    def __init__(self, bank, min_confidence=MIN_CONFIDENCE):
+        self.bank = bank
+        self.min_confidence = min_confidence
+
+    def _classify(self, chars):
+        """글자 (N, H, W) → (레이블 (N,), 신뢰도 (N,) float32)"""
+        if len(chars) == 0:
+            return np.empty(0, dtype=self.bank.labels.dtype), np.empty(0, dtype=np.float32)
+        scores = self.bank.scores(chars)
+        best = scores.argmax(axis=1)
+        confidence = np.clip(scores[np.arange(len(chars)), best], 0, 1)
+        labels = np.where(confidence >= self.min_confidence, self.bank.labels[best], UNKNOWN_CHAR)
+        return labels, confidence
+
+    def recognize(self, chars):
+        """번호판 하나의 글자 배열 → (문자열, 글자별 신뢰도 (N,))"""
+        labels, confidence = self._classify(chars)
+        return ''.join(labels), confidence
+
+    def recognize_batch(self, char_sets):
+        """여러 번호판의 글자 배열 목록 → [(문자열, 글자별 신뢰도), ...] (상관 계산은 한 번)"""
+        counts = [len(chars) for chars in char_sets]
+        if not char_sets or sum(counts) == 0:
+            return [('', np.empty(0, dtype=np.float32)) for _ in char_sets]
+        labels, confidence = self._classify(np.concatenate(char_sets))
+        bounds = np.cumsum(counts)[:-1]
+        return [(''.join(plate_labels), plate_confidence)
+                for plate_labels, plate_confidence in zip(np.split(labels, bounds), np.split(confidence, bounds))]
+
+
+# 경로별로 한 번만 읽은 템플릿 묶음 (파이프라인 연산과 배치 작업자가 공유)
+_loaded_banks = {}
+
+
+def get_template_bank(path=DEFAULT_TEMPLATE_BANK):
+    """템플릿 묶음을 읽어 재사용 (같은 경로는 한 번만 읽음, 파일이 없으면 만드는 방법과 함께 FileNotFoundError)"""
+    bank = _loaded_banks.get(path)
+    if bank is None:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"템플릿 묶음이 없습니다: {path} "
+                                    f"(python plate_recognizer.py --bank {path} build --plates 로 생성)")
+        bank = _loaded_banks[path] = TemplateBank.load(path)
+    return bank
+
+
+def glyph_from_image(image, char_size=SEGMENT_PARAMS['char_size'], dark_text=True):
+    """글자 하나가 담긴 이미지 → 분할 결과와 같은 형식의 (H, W) uint8 템플릿
+
+    Otsu로 이진화한 뒤 글자 픽셀 전체의 경계 상자를 crop_characters로 정규화합니다.
+    """
+    gray = pp.convert_to_grayscale(image)
+    flags = cv2.THRESH_BINARY_INV if dark_text else cv2.THRESH_BINARY
+    _, mask = cv2.threshold(gray, 0, 255, flags | cv2.THRESH_OTSU)
+    box = np.array([cv2.boundingRect(mask)], dtype=np.int32)
+    if box[0, 2] == 0 or box[0, 3] == 0:
+        raise ValueError('글자 픽셀이 없는 이미지입니다')
+    return crop_characters(mask, box, tuple(char_size))[0]
+
+
+def build_template_bank(image_dir, char_size=SEGMENT_PARAMS['char_size']):
+    """<글자>_<번호>.png 파일들로 템플릿 묶음 생성 (밑줄 앞부분이 레이블)"""
+    glyphs, labels = [], []
+    for file_name in sorted(os.listdir(image_dir)):
+        label, ext = os.path.splitext(file_name)
+        if ext.lower() not in ('.png', '.jpg', '.bmp'):
+            continue
+        image = cv2.imdecode(np.fromfile(os.path.join(image_dir, file_name), dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            print(f"이미지를 읽을 수 없습니다: {file_name}")
+            continue
+        glyphs.append(glyph_from_image(image, char_size))
+        labels.append(label.split('_')[0])
+    if not glyphs:
+        raise ValueError(f'{image_dir}에 템플릿 이미지가 없습니다')
+    return TemplateBank(np.stack(glyphs), labels)
+
+
+def load_plate_labels(path=DEFAULT_PLATE_LABELS):
+    """번호판 이름 → 글자 상자별 레이블 목록"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build_bank_from_plates(plate_labels, char_size=SEGMENT_PARAMS['char_size']):
+    """레이블이 있는 추출 번호판을 segment_plate로 분할하여 글자마다 템플릿 생성
+
+    분할된 상자 수가 레이블 수와 다른 번호판(흐리거나 분할이 어긋난 번호판)은 건너뜁니다.
+    """
+    glyphs, labels = [], []
+    for plate_name, plate_text in sorted(plate_labels.items()):
+        plate_img = pp.load_extracted_plate(plate_name)
+        if plate_img is None:
+            continue
+        chars, _ = segment_plate(plate_img, {'char_size': tuple(char_size)})
+        if len(chars) != len(plate_text):
+            print(f"{plate_name}: 분할된 글자 {len(chars)}개가 레이블 {len(plate_text)}개와 달라 건너뜁니다")
+            continue
+        glyphs.extend(chars)
+        labels.extend(plate_text)
+    if not glyphs:
+        raise ValueError('템플릿으로 쓸 번호판이 없습니다')
+    return TemplateBank(np.stack(glyphs), labels)
+
+
+def render_digit_templates(char_size=SEGMENT_PARAMS['char_size'],
+                           fonts=(cv2.FONT_HERSHEY_SIMPLEX, cv2.FONT_HERSHEY_DUPLEX), thickness=(4, 6)):
+    """OpenCV 내장 글꼴로 숫자 0-9 템플릿 생성 (한글 글자는 실제 번호판 글자 이미지로 추가)"""
+    glyphs, labels = [], []
+    for font in fonts:
+        for line in thickness:
+            for digit in '0123456789':
+                canvas = np.full((120, 100), 255, dtype=np.uint8)
+                cv2.putText(canvas, digit, (10, 100), font, 3, 0, line)
+                glyphs.append(glyph_from_image(canvas, char_size))
+                labels.append(digit)
+    return TemplateBank(np.stack(glyphs), labels)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='오프라인 템플릿 매칭 번호판 글자 인식')
+    parser.add_argument('--bank', default=DEFAULT_TEMPLATE_BANK, help='템플릿 묶음 경로')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='템플릿 묶음 생성')
+    build_parser.add_argument('image_dir', nargs='?', help='<글자>_<번호>.png 이미지 폴더')
+    build_parser.add_argument('--plates', nargs='?', const=DEFAULT_PLATE_LABELS,
+                              help='번호판별 글자 레이블 JSON으로 추출 번호판에서 템플릿 추가')
+    build_parser.add_argument('--digits', action='store_true', help='내장 글꼴 숫자 템플릿 추가')
+
+    evaluate_parser = subparsers.add_parser('evaluate', help='번호판마다 나머지 번호판의 템플릿으로 인식 정확도 확인')
+    evaluate_parser.add_argument('--labels', default=DEFAULT_PLATE_LABELS, help='번호판별 글자 레이블 JSON')
+
+    recognize_parser = subparsers.add_parser('recognize', help='추출된 번호판 인식')
+    recognize_parser.add_argument('plates', nargs='*', help='번호판 이름 (없으면 입력 폴더 전체)')
+    recognize_parser.add_argument('--min-confidence', type=float, default=MIN_CONFIDENCE,
+                                  help=f'이보다 낮은 신뢰도의 글자는 {UNKNOWN_CHAR}로 표시')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        banks = []
+        if args.image_dir:
+            banks.append(build_template_bank(args.image_dir))
+        if args.plates:
+            banks.append(build_bank_from_plates(load_plate_labels(args.plates)))
+        if args.digits:
+            banks.append(render_digit_templates())
+        if not banks:
+            parser.error('image_dir, --plates 또는 --digits가 필요합니다')
+        bank = TemplateBank(np.concatenate([b.glyphs for b in banks]), np.concatenate([b.labels for b in banks]))
+        bank.save(args.bank)
+        print(f"템플릿 {len(bank.labels)}개 (글자 {len(set(bank.labels))}종) 저장: {args.bank}")
+    elif args.command == 'evaluate':
+        plate_labels = load_plate_labels(args.labels)
+        correct_plates = correct_chars = total_chars = 0
+        for plate_name, plate_text in sorted(plate_labels.items()):
+            others = {name: text for name, text in plate_labels.items() if name != plate_name}
+            recognizer = TemplateRecognizer(build_bank_from_plates(others))
+            chars, _ = segment_plate(pp.load_extracted_plate(plate_name), {'char_size': recognizer.bank.char_size})
+            labels, confidence = recognizer._classify(chars)
+            matched = sum(a == b for a, b in zip(labels, plate_text))
+            correct_plates += list(labels) == plate_text
+            correct_chars += matched
+            total_chars += len(plate_text)
+            print(f"{plate_name}: {''.join(labels)} (정답 {''.join(plate_text)}, 글자 {matched}/{len(plate_text)})")
+        print(f"번호판 {correct_plates}/{len(plate_labels)}, 글자 {correct_chars}/{total_chars}")
+    else:
+        try:
+            bank = get_template_bank(args.bank)
+        except FileNotFoundError as e:
+            parser.error(str(e))
+        recognizer = TemplateRecognizer(bank, args.min_confidence)
+        plate_names, char_sets = [], []
+        for plate_name in args.plates or pp.list_plate_names():
+            plate_img = pp.load_extracted_plate(plate_name)
+            if plate_img is None:
+                print(f"{plate_name}: 이미지를 읽을 수 없습니다")
+                continue
+            chars, _ = segment_plate(plate_img, {'char_size': recognizer.bank.char_size})
+            plate_names.append(plate_name)
+            char_sets.append(chars)
+
+        # 모든 번호판의 글자를 한 번에 인식
+        for plate_name, (text, confidence) in zip(plate_names, recognizer.recognize_batch(char_sets)):
+            scores = ' '.join(f'{c:.2f}' for c in confidence)
+            print(f"{plate_name}: {text or '(글자 없음)'} [{scores}]")
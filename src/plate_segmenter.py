@@ -0,0 +1,218 @@
+# 번호판 글자 분할 (plate_segmenter.py)
+#
+# 임계처리된 번호판의 연결 성분(connectedComponentsWithStats)에서 글자 후보를 골라 왼쪽부터 정렬하고,
+# 한글처럼 자모가 따로 검출된 글자(예: '가'의 ㄱ과 ㅏ)는 하나의 상자로 합친 뒤
+# 모든 글자를 미리 할당한 (N, H, W) uint8 배열 하나에 같은 크기로 정규화하여 담습니다.
+# 인식 단계는 번호판마다 작은 조각 목록 대신 배열 하나와 경계 상자 (N, 4)를 받습니다.
+
+import argparse
+
+import cv2
+import numpy as np
+
+import plate_processor as pp
+
+
+# 글자 분할 기본 파라미터
+SEGMENT_PARAMS = {
+    'min_area': 30,            # 조각(자모) 최소 픽셀 수
+    'max_area': 4000,          # 조각 최대 픽셀 수
+    'min_aspect': 0.1,         # 합친 글자 상자의 최소 가로/세로 비율 ('1' 같은 좁은 글자 포함)
+    'max_aspect': 1.2,         # 합친 글자 상자의 최대 가로/세로 비율
+    'min_height_ratio': 0.2,   # 번호판 높이 대비 글자 높이 최소 비율
+    'max_height_ratio': 0.95,  # 번호판 높이 대비 글자 높이 최대 비율
+    # 아래 항목은 번호판마다 추정한 글자 하나의 높이/폭(키 큰 조각들의 중앙값) 대비 비율
+    'min_glyph_height': 0.65,  # 이보다 낮은 상자는 글자가 아님 (볼트 구멍, 테두리 조각)
+    'max_glyph_width': 1.4,    # 합친 상자의 최대 폭 (글자 하나 폭)
+    'stack_overlap': 0.5,      # 좁은 쪽 폭 대비 가로 겹침이 이 이상이면 위아래로 쌓인 조각
+    'max_stack_piece': 0.75,   # 위아래로 합칠 조각의 최대 높이 (글자 높이의 조각만 합침)
+    'max_side_gap': 0.1,       # 옆으로 합칠 조각(예: '바'의 ㅂ과 ㅏ) 사이 최대 간격
+    'side_height_ratio': 0.9,  # 옆으로 합칠 조각은 낮은 쪽이 높은 쪽의 이 비율 미만이어야 함
+                               # (세로 겹침도 낮은 쪽 높이의 stack_overlap 이상이어야 함)
+    'char_size': (32, 24),     # 정규화한 글자 크기 (H, W)
+    'dark_text': True,         # 글자가 배경보다 어두운 번호판 (임계처리 결과에서 글자가 0)
+    # segment_plate의 글자용 이진화 (획 두께보다 충분히 큰 블록이어야 획 안쪽이 비지 않음)
+    'block_size': 41,
+    'C': 10,
+    'blur_ksize': (5, 5),
+}
+
+
+def candidate_boxes(stats, plate_shape, params=SEGMENT_PARAMS):
+    """연결 성분 통계에서 글자 조각 후보 → (상자 (N, 4) [x, y, w, h], 성분 번호 (N,)), x 순서
+
+    픽셀 수가 범위를 벗어나거나, 번호판 가장자리에 닿거나(테두리, 배경),
+    번호판만큼 높은 성분은 제외합니다. stats는 connectedComponentsWithStats의 결과(0번은 배경)입니다.
+    """
+    rows, cols = plate_shape[:2]
+    stats = stats[1:]
+    x, y, w, h, area = (stats[:, i] for i in range(5))
+    keep = (area > params['min_area']) & (area < params['max_area'])
+    keep &= (x > 0) & (y > 0) & (x + w < cols) & (y + h < rows)
+    keep &= h <= params['max_height_ratio'] * rows
+
+    boxes = stats[keep, :4].astype(np.int32)
+    component_ids = np.flatnonzero(keep) + 1
+    order = np.argsort(boxes[:, 0], kind='stable')
+    return boxes[order], component_ids[order]
+
+
+def glyph_size(boxes):
+    """조각 상자들에서 글자 하나의 높이/폭 추정 (가장 높은 조각의 절반 이상인 조각들의 중앙값)"""
+    if len(boxes) == 0:
+        return 0.0, 0.0
+    tall = boxes[boxes[:, 3] >= boxes[:, 3].max() / 2]
+    return float(np.median(tall[:, 3])), float(np.median(tall[:, 2]))
+
+
+def _same_glyph(a, b, glyph_h, params):
+    """원래 조각 상자 a, b가 한 글자의 자모인지 (위아래로 쌓였거나, 높이가 다른 옆 조각)"""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    overlap = min(ax + aw, bx + bw) - max(ax, bx)
+    if overlap >= params['stack_overlap'] * min(aw, bw):
+        return max(ah, bh) <= params['max_stack_piece'] * glyph_h
+    gap = -overlap
+    v_overlap = min(ay + ah, by + bh) - max(ay, by)
+    return (gap <= params['max_side_gap'] * glyph_h
+            and v_overlap >= params['stack_overlap'] * min(ah, bh)
+            and min(ah, bh) < params['side_height_ratio'] * max(ah, bh))
+
+
+def merge_split_glyphs(boxes, params=SEGMENT_PARAMS):
+    """한 글자가 여러 조각으로 검출된 경우(예: '도'의 ㄷ과 ㅗ, 지역명 '경기', '바'의 ㅂ과 ㅏ) 한 상자로 합침
+
+    합칠지는 지금까지 합친 상자가 아니라 원래 조각 상자끼리 비교하여 정하고(_same_glyph),
+    합친 폭이 글자 하나 폭(max_glyph_width)을 넘는 묶음은 만들지 않으므로
+    높이가 같은 이웃 숫자끼리나 여러 글자에 걸쳐 이어지지 않습니다.
+    """
+    glyph_h, glyph_w = glyph_size(boxes)
+    max_width = params['max_glyph_width'] * glyph_w
+    pieces = boxes.tolist()
+    parent = list(range(len(pieces)))
+    bounds = [[x, y, x + w, y + h] for x, y, w, h in pieces]
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = i = parent[parent[i]]
+        return i
+
+    # 가까운 조각 쌍부터 묶음(union-find)을 합치되, 합친 폭이 글자 하나 폭 이하일 때만 합침
+    pairs = sorted(((max(pieces[j][0] - (pieces[i][0] + pieces[i][2]), 0), i, j)
+                    for i in range(len(pieces)) for j in range(i + 1, len(pieces))))
+    for _, i, j in pairs:
+        ri, rj = root(i), root(j)
+        if ri == rj or not _same_glyph(pieces[i], pieces[j], glyph_h, params):
+            continue
+        x0, y0 = min(bounds[ri][0], bounds[rj][0]), min(bounds[ri][1], bounds[rj][1])
+        x1, y1 = max(bounds[ri][2], bounds[rj][2]), max(bounds[ri][3], bounds[rj][3])
+        if x1 - x0 <= max_width:
+            parent[rj] = ri
+            bounds[ri] = [x0, y0, x1, y1]
+
+    merged = np.array([[x0, y0, x1 - x0, y1 - y0] for i, (x0, y0, x1, y1) in enumerate(bounds) if root(i) == i],
+                      dtype=np.int32).reshape(-1, 4)
+    return merged[np.argsort(merged[:, 0], kind='stable')], glyph_h
+
+
+def filter_char_boxes(boxes, plate_shape, glyph_h, params=SEGMENT_PARAMS):
+    """합친 상자 중 글자 크기/비율 조건을 만족하는 상자만 남김"""
+    rows = plate_shape[0]
+    w, h = boxes[:, 2], boxes[:, 3]
+    aspect = w / np.maximum(h, 1)
+    keep = ((h >= params['min_height_ratio'] * rows) & (h <= params['max_height_ratio'] * rows)
+            & (h >= params['min_glyph_height'] * glyph_h)
+            & (aspect >= params['min_aspect']) & (aspect <= params['max_aspect']))
+    return boxes[keep]
+
+
+def crop_characters(glyph_mask, boxes, char_size=(32, 24), out=None):
+    """상자마다 글자를 잘라 비율을 유지한 채 char_size 가운데에 맞춘 (N, H, W) uint8 배열 반환
+
+    glyph_mask: 글자가 255, 배경이 0인 이진 영상 (배열의 빈 자리도 0)
+    out: 미리 할당한 (N 이상, H, W) uint8 배열 (앞 N개를 사용)
+    """
+    cell_h, cell_w = char_size
+    if out is None:
+        out = np.zeros((len(boxes), cell_h, cell_w), dtype=np.uint8)
+    else:
+        if out.dtype != np.uint8 or out.ndim != 3 or out.shape[1:] != (cell_h, cell_w) or len(out) < len(boxes):
+            raise ValueError(f'out은 ({len(boxes)} 이상, {cell_h}, {cell_w}) uint8 배열이어야 합니다 '
+                             f'(받은 배열: {out.shape} {out.dtype})')
+        out = out[:len(boxes)]
+        out[...] = 0
+
+    for i, (x, y, w, h) in enumerate(boxes.tolist()):
+        crop = glyph_mask[y:y + h, x:x + w]
+        scale = min(cell_h / h, cell_w / w)
+        size_w, size_h = max(1, round(w * scale)), max(1, round(h * scale))
+        top, left = (cell_h - size_h) // 2, (cell_w - size_w) // 2
+        out[i, top:top + size_h, left:left + size_w] = cv2.resize(crop, (size_w, size_h),
+                                                                  interpolation=cv2.INTER_AREA)
+    return out
+
+
+def segment_characters(thresh_plate, params=None, out=None):
+    """임계처리된 번호판에서 글자를 분할 → (글자 배열 (N, H, W) uint8, 경계 상자 (N, 4) int32)
+
+    어두운 글자를 전경으로 뒤집은 영상의 8-연결 성분을 조각으로 씁니다. 번호판 테두리처럼
+    가장자리에 닿는 성분은 버리므로 테두리 안쪽의 글자가 함께 사라지지 않습니다.
+    글자 배열은 글자가 255, 배경이 0입니다 (다른 성분의 픽셀은 지움).
+    params: SEGMENT_PARAMS 중 바꿀 항목
+    """
+    params = {**SEGMENT_PARAMS, **(params or {})}
+    glyph_mask = cv2.bitwise_not(thresh_plate) if params['dark_text'] else thresh_plate
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(glyph_mask, connectivity=8, ltype=cv2.CV_32S)
+
+    pieces, component_ids = candidate_boxes(stats, glyph_mask.shape, params)
+    merged, glyph_h = merge_split_glyphs(pieces, params)
+    boxes = filter_char_boxes(merged, glyph_mask.shape, glyph_h, params)
+
+    # 조각 성분만 남긴 마스크에서 잘라 상자 안에 걸친 테두리/잡음 픽셀이 섞이지 않게 함
+    lut = np.zeros(count, dtype=np.uint8)
+    lut[component_ids] = 255
+    chars = crop_characters(lut[labels], boxes, tuple(params['char_size']), out=out)
+    return chars, boxes
+
+
+def segment_plate(plate_img, params=None, out=None):
+    """번호판 이미지를 글자용으로 이진화한 뒤 글자 분할 (결과 파일은 저장하지 않음)
+
+    파이프라인의 임계처리(blockSize 11)는 획 두께보다 블록이 작아 획이 윤곽만 남으므로,
+    SEGMENT_PARAMS의 더 큰 블록으로 흑백 번호판을 따로 이진화합니다.
+    """
+    params = {**SEGMENT_PARAMS, **(params or {})}
+    gray_plate = pp.convert_to_grayscale(plate_img)
+    blurred = cv2.GaussianBlur(gray_plate, tuple(params['blur_ksize']), 0)
+    thresh_plate = cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY,
+                                         params['block_size'], params['C'])
+    return segment_characters(thresh_plate, params, out)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='추출된 번호판의 글자 분할')
+    parser.add_argument('plates', nargs='*', help='번호판 이름 (없으면 입력 폴더 전체)')
+    parser.add_argument('--output', help='번호판별 글자 배열/상자를 저장할 .npz 경로')
+    parser.add_argument('--show', action='store_true', help='번호판별 분할 결과를 화면에 표시')
+    args = parser.parse_args()
+
+    arrays = {}
+    for plate_name in args.plates or pp.list_plate_names():
+        plate_img = pp.load_extracted_plate(plate_name)
+        if plate_img is None:
+            print(f"{plate_name}: 이미지를 읽을 수 없습니다")
+            continue
+
+        chars, boxes = segment_plate(plate_img)
+        print(f"{plate_name}: 글자 {len(chars)}개 {boxes.tolist()}")
+        arrays[f'{plate_name}_chars'] = chars
+        arrays[f'{plate_name}_boxes'] = boxes
+
+        if args.show and len(chars):
+            cv2.imshow(f'{plate_name} characters', cv2.hconcat(list(chars)))
+            cv2.waitKey(0)
+            cv2.destroyAllWindows()
+
+    if args.output:
+        np.savez_compressed(args.output, **arrays)
+        print(f"저장 완료: {args.output}")
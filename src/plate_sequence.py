@@ -0,0 +1,118 @@
+# 추출 번호판 파일 순번 할당 (plate_sequence.py)
+#
+# 저장할 때마다 폴더 전체를 os.listdir로 훑어 다음 _NNN 순번을 찾는 대신,
+# 폴더 안의 작은 인덱스 파일에 (타임스탬프, 마지막 순번)을 기록해 두고 파일 잠금 아래에서
+# 다음 순번을 O(1)로 할당합니다. 여러 추출 프로세스가 동시에 저장해도 같은 이름을 받지 않고,
+# PNG는 임시 파일에 쓴 뒤 rename하므로 잘린 파일이 보이지 않습니다.
+# 임시 파일은 mkstemp가 0600으로 만들므로 rename 전에 open()으로 만든 파일과 같은 권한으로 바꿉니다.
+
+import os
+import json
+import datetime
+import tempfile
+import contextlib
+
+import cv2
+
+from plate_fileutil import chmod_default
+
+# 파일 잠금: POSIX는 fcntl, Windows는 msvcrt
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+INDEX_NAME = '.plate_sequence.json'
+LOCK_NAME = '.plate_sequence.lock'
+
+@contextlib.contextmanager
+def _locked(lock_path):
+    """lock_path 파일에 대한 배타적 잠금 (다른 프로세스는 해제될 때까지 대기)"""
+    with open(lock_path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class SequenceAllocator:
+    """output_dir의 plate_<타임스탬프>_<순번>.png 이름을 겹치지 않게 할당
+
+    타임스탬프도 잠금 안에서 정하므로 프로세스 사이에서 인덱스의 타임스탬프가 뒤로 가지 않습니다.
+    인덱스가 없거나(기존 폴더) 손상되어도 후보 이름이 이미 있으면 건너뛰므로 기존 파일을 덮어쓰지 않습니다.
+    """
+
+    def __init__(self, output_dir='../extracted_plates'):
+        self.output_dir = output_dir
+        self.index_path = os.path.join(output_dir, INDEX_NAME)
+        self.lock_path = os.path.join(output_dir, LOCK_NAME)
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                index = json.load(f)
+            return index['timestamp'], int(index['sequence'])
+        except (OSError, ValueError, KeyError):
+            return None, 0
+
+    def _write_index(self, timestamp, sequence):
+        fd, tmp_path = tempfile.mkstemp(dir=self.output_dir, prefix='.plate_sequence_', suffix='.tmp')
+        chmod_default(fd)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'timestamp': timestamp, 'sequence': sequence}, f)
+        os.replace(tmp_path, self.index_path)
+
+    def allocate(self):
+        """다음 저장 경로 반환 (예: ../extracted_plates/plate_20250731_123000_001.png)"""
+        with _locked(self.lock_path):
+            # 현재 타임스탬프 생성
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+
+            # 같은 타임스탬프면 마지막 순번 + 1, 새 타임스탬프면 1부터
+            last_timestamp, sequence = self._read_index()
+            if last_timestamp != timestamp:
+                sequence = 0
+
+            # 순번은 항상 세 자리로 포맷팅합니다 (예: 1 -> 001, 10 -> 010)
+            while True:
+                sequence += 1
+                path = f"{self.output_dir}/plate_{timestamp}_{sequence:03d}.png"
+                if not os.path.exists(path):
+                    break
+
+            self._write_index(timestamp, sequence)
+        return path
+
+
+def write_image_atomic(path, image, ext='.png'):
+    """이미지를 같은 폴더의 임시 파일에 쓴 뒤 rename, 성공 여부 반환
+
+    임시 파일은 .png로 끝나지 않으므로 감시/일괄 처리에서 쓰는 중인 파일을 읽지 않습니다.
+    """
+    ok, encoded = cv2.imencode(ext, image)
+    if not ok:
+        return False
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix='.plate_', suffix='.tmp')
+    try:
+        chmod_default(fd)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(encoded.tobytes())
+        os.replace(tmp_path, path)
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        return False
+    return True
@@ -0,0 +1,245 @@
+# 동영상/스트림 번호판 처리 (plate_stream.py)
+#
+# 녹화된 출입구 영상을 cv2.VideoCapture로 읽어 번호판 검출 → 원근 변환 → plate_processor 단계를
+# 프레임마다 수행합니다. stride로 건너뛸 프레임은 grab()만 하여 색 변환과 복사를 하지 않고,
+# 움직임 게이트로 이전 프레임과 차이가 없는 프레임을 거릅니다. 프레임/게이트 버퍼는 한 번 만들어
+# 계속 재사용하고 결과는 하나씩 흘려보내므로 몇 시간짜리 영상도 메모리가 늘지 않습니다.
+
+import os
+import time
+import argparse
+import contextlib
+
+import cv2
+
+import plate_processor as pp
+from plate_buffers import BufferPool, set_buffer_pool, get_buffer_pool
+from plate_localizer import localize_plate, warp_plate
+from plate_warp_cache import WarpMapCache
+
+
+class MotionGate:
+    """축소한 흑백 프레임이 직전 프레임과 거의 같으면 거르는 게이트
+
+    roi: (x, y, w, h) 지정 시 그 영역의 변화만 봅니다 (예: 출입구 차단기 앞).
+    scale: 비교 전 축소 비율. 작을수록 빠르고 센서 잡음에 둔감합니다.
+    threshold: 픽셀 밝기 차이가 이보다 커야 바뀐 픽셀로 셉니다.
+    min_changed: 바뀐 픽셀 비율이 이 이상이어야 움직임으로 봅니다.
+    """
+
+    def __init__(self, roi=None, scale=0.25, threshold=25, min_changed=0.01):
+        self.roi = roi
+        self.scale = scale
+        self.threshold = threshold
+        self.min_changed = min_changed
+        self._source_shape = None
+        self._small = None
+        self._gray = None
+        self._prev = None
+        self._diff = None
+
+    def _allocate(self, view):
+        self._source_shape = view.shape
+        rows, cols = view.shape[:2]
+        size = (max(1, int(cols * self.scale)), max(1, int(rows * self.scale)))
+        self._small = cv2.resize(view, size, interpolation=cv2.INTER_AREA)
+        self._gray = cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY)
+        self._prev = self._gray.copy()
+        self._diff = self._gray.copy()
+
+    def changed(self, frame):
+        """직전 프레임 대비 움직임이 있으면 True (첫 프레임은 항상 True)"""
+        if self.roi is not None:
+            x, y, w, h = self.roi
+            frame = frame[y:y + h, x:x + w]
+
+        if frame.shape != self._source_shape:
+            self._allocate(frame)
+            return True
+
+        # 미리 만든 버퍼에 축소/흑백 변환/차이를 계산 (프레임마다 새 배열을 만들지 않음)
+        cv2.resize(frame, (self._small.shape[1], self._small.shape[0]), dst=self._small,
+                   interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        cv2.absdiff(self._gray, self._prev, dst=self._diff)
+        cv2.threshold(self._diff, self.threshold, 255, cv2.THRESH_BINARY, dst=self._diff)
+        changed_ratio = cv2.countNonZero(self._diff) / self._diff.size
+
+        self._gray, self._prev = self._prev, self._gray
+        return changed_ratio >= self.min_changed
+
+
+class StreamStats:
+    """스트림 하나의 프레임 카운터와 처리 속도"""
+
+    COUNTERS = ('frames', 'stride_skipped', 'motion_skipped', 'decode_failed', 'no_plate', 'processed')
+
+    def __init__(self, name, source_fps=0.0):
+        self.name = name
+        self.source_fps = source_fps
+        self.counts = dict.fromkeys(self.COUNTERS, 0)
+        self.start = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    @property
+    def dropped(self):
+        """처리하지 않고 넘긴 프레임 수 (stride, 움직임 없음, 디코딩 실패)"""
+        return self.counts['stride_skipped'] + self.counts['motion_skipped'] + self.counts['decode_failed']
+
+    def as_dict(self):
+        elapsed = self.elapsed
+        input_fps = self.counts['frames'] / elapsed if elapsed > 0 else 0.0
+        return {
+            'stream': self.name,
+            **self.counts,
+            'dropped': self.dropped,
+            'elapsed_s': elapsed,
+            'input_fps': input_fps,
+            'processed_fps': self.counts['processed'] / elapsed if elapsed > 0 else 0.0,
+            # 1보다 크면 실시간보다 빠르게 처리
+            'realtime_factor': input_fps / self.source_fps if self.source_fps > 0 else None,
+        }
+
+    def report(self):
+        s = self.as_dict()
+        realtime = f", 실시간 대비 x{s['realtime_factor']:.2f}" if s['realtime_factor'] else ''
+        return (f"[{s['stream']}] 프레임 {s['frames']}개 (처리 {s['processed']}, 버림 {s['dropped']}, "
+                f"번호판 없음 {s['no_plate']}), 입력 {s['input_fps']:.1f} FPS, "
+                f"처리 {s['processed_fps']:.1f} FPS{realtime}")
+
+
+def _open_capture(source):
+    """파일 경로, URL 또는 카메라 번호(숫자 문자열)로 VideoCapture 열기"""
+    capture = cv2.VideoCapture(int(source) if str(source).isdigit() else source)
+    if not capture.isOpened():
+        raise OSError(f'영상을 열 수 없습니다: {source}')
+    return capture
+
+
+def process_frame_plate(frame, warp_cache=None, plate_name=None, max_dim=None):
+    """프레임 한 장에서 번호판을 찾아 plate_processor 단계를 수행, 요약 반환 (번호판이 없으면 None)
+
+    plate_name이 주어지면 단계별 결과를 save_processed_results로 저장합니다.
+    max_dim이 주어지면 긴 변이 그 이하인 축소본에서 위치를 찾고 원본 프레임에서 원근 변환합니다.
+    버퍼 풀이 연결되어 있으면 단계 출력 배열을 풀에서 꺼내 쓰고 프레임이 끝나면 반납합니다.
+    """
+    corners = localize_plate(frame, max_dim)
+    if corners is None:
+        return None
+
+    pool = get_buffer_pool()
+    with pool.scope() if pool is not None else contextlib.nullcontext():
+        return _process_plate_stages(frame, corners, warp_cache, plate_name)
+
+
+def _process_plate_stages(frame, corners, warp_cache, plate_name):
+    params = pp.PIPELINE_PARAMS
+    plate = warp_plate(frame, corners, warp_cache=warp_cache)
+    gray_plate = pp.convert_to_grayscale(plate)
+    enhanced_plate = pp.maximize_contrast(gray_plate, params['contrast_ksize'])
+    thresh_plate, = pp.adaptive_threshold_plate(enhanced_plate, methods=('gaussian',),
+                                                block_size=params['block_size'], C=params['C'],
+                                                blur_ksize=params['blur_ksize'])
+    contours, contour_result, features = pp.find_contours_in_plate(thresh_plate, return_features=True)
+    potential_chars = pp.prepare_for_next_step(contours, thresh_plate, features)
+
+    if plate_name is not None:
+        pp.save_processed_results(plate_name, gray_plate, enhanced_plate, thresh_plate, contour_result)
+
+    return {'corners': corners, 'contours': len(contours), 'potential_chars': potential_chars}
+
+
+def iter_stream(source, stats=None, stride=1, gate=None, warp_cache=None, save=False, max_frames=None,
+                max_dim=None):
+    """영상의 프레임을 처리하며 번호판을 찾은 프레임마다 요약을 yield
+
+    stats(StreamStats)를 넘기면 진행 중에도 카운터를 볼 수 있습니다.
+    단계 함수의 콘솔 출력은 프레임마다 쌓이지 않도록 버립니다.
+    """
+    capture = _open_capture(source)
+    stream_name = os.path.splitext(os.path.basename(str(source)))[0]
+    if stats is None:
+        stats = StreamStats(stream_name)
+    stats.source_fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+
+    frame = None
+    frame_index = -1
+    try:
+        with open(os.devnull, 'w') as devnull:
+            while max_frames is None or stats.counts['frames'] < max_frames:
+                # stride 사이의 프레임은 retrieve(색 변환, 복사) 없이 넘김
+                if not capture.grab():
+                    break
+                frame_index += 1
+                stats.counts['frames'] += 1
+                if frame_index % stride:
+                    stats.counts['stride_skipped'] += 1
+                    continue
+
+                # 같은 크기이면 이전 프레임 버퍼에 그대로 디코딩
+                ok, decoded = capture.retrieve(frame)
+                if not ok:
+                    stats.counts['decode_failed'] += 1
+                    continue
+                frame = decoded
+
+                if gate is not None and not gate.changed(frame):
+                    stats.counts['motion_skipped'] += 1
+                    continue
+
+                plate_name = f'{stream_name}_f{frame_index:07d}' if save else None
+                with contextlib.redirect_stdout(devnull):
+                    result = process_frame_plate(frame, warp_cache, plate_name, max_dim)
+                if result is None:
+                    stats.counts['no_plate'] += 1
+                    continue
+
+                stats.counts['processed'] += 1
+                yield {'stream': stream_name, 'frame': frame_index, **result}
+    finally:
+        capture.release()
+
+
+def process_stream(source, stride=1, gate=None, warp_cache=None, save=False, max_frames=None, report_every=5.0,
+                   max_dim=None):
+    """영상 하나를 끝까지 처리하며 report_every초마다 진행 상황 출력, StreamStats 반환"""
+    stats = StreamStats(os.path.splitext(os.path.basename(str(source)))[0])
+    last_report = time.perf_counter()
+    for result in iter_stream(source, stats, stride, gate, warp_cache, save, max_frames, max_dim):
+        if time.perf_counter() - last_report >= report_every:
+            print(stats.report())
+            last_report = time.perf_counter()
+    print(stats.report())
+    return stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='녹화 영상/스트림 번호판 처리')
+    parser.add_argument('sources', nargs='+', help='영상 파일, 스트림 URL 또는 카메라 번호')
+    parser.add_argument('--stride', type=int, default=1, help='N 프레임마다 한 프레임만 처리')
+    parser.add_argument('--roi', type=lambda v: tuple(int(n) for n in v.split(',')),
+                        help='움직임 게이트 영역 x,y,w,h')
+    parser.add_argument('--motion-threshold', type=float, default=0.01,
+                        help='처리할 최소 변화 픽셀 비율 (0이면 게이트 끔)')
+    parser.add_argument('--save', action='store_true', help='프레임별 단계 결과를 processed_plates에 저장')
+    parser.add_argument('--max-frames', type=int, help='스트림별 최대 프레임 수')
+    parser.add_argument('--report-every', type=float, default=5.0, help='진행 상황 출력 간격 (초)')
+    parser.add_argument('--max-dim', type=int, default=0,
+                        help='긴 변이 이보다 큰 프레임은 축소본에서 위치 검출 (0이면 원본 크기에서 검출)')
+    parser.add_argument('--warp-quantum', type=float, default=0,
+                        help='원근 변환 맵 캐시의 모서리 양자화 단위 (픽셀, 0이면 캐시 끔). 고정 카메라에서 '
+                             '모서리 흔들림보다 크게 (예: 4) 주면 조회표를 재사용하지만 그만큼 어긋난 영역을 변환')
+    args = parser.parse_args()
+
+    # 단계 출력 버퍼는 프레임마다 재사용하고, 원근 변환 맵 캐시는 양자화 단위를 준 경우에만 사용
+    warp_cache = WarpMapCache(quantum=args.warp_quantum) if args.warp_quantum > 0 else None
+    set_buffer_pool(BufferPool())
+    for source in args.sources:
+        gate = MotionGate(args.roi, min_changed=args.motion_threshold) if args.motion_threshold > 0 else None
+        process_stream(source, args.stride, gate, warp_cache, args.save, args.max_frames, args.report_every,
+                       args.max_dim or None)
+    if warp_cache is not None:
+        print(f"원근 변환 맵 캐시: 적중 {warp_cache.hits}회, 새로 계산 {warp_cache.misses}회")
@@ -0,0 +1,195 @@
+# 파이프라인 파라미터 탐색 (plate_sweep.py)
+#
+# 대비 커널 크기, 블러 크기, 적응형 임계처리 blockSize/C, 글자 면적 범위의 모든 조합을
+# extracted_plates/의 번호판에 적용하여, prepare_for_next_step의 잠재적 글자 수가
+# 기대 글자 수에 얼마나 가까운지로 순위를 매깁니다.
+# 단계 순서대로 앞부분(prefix)이 같은 조합은 그 결과를 한 번만 계산하여 공유하고
+# (로드/그레이스케일은 번호판당 1번, 대비는 커널 크기당 1번, ...),
+# 마지막 임계처리 + 윤곽선 단계(leaf)는 스레드 풀에서 병렬로 실행합니다.
+
+import json
+import time
+import argparse
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+import plate_processor as pp
+from plate_loader import get_plate_loader
+
+
+# 탐색하는 파라미터 (단계 순서대로)
+SWEEP_PARAMS = ('contrast_ksize', 'blur_ksize', 'method', 'block_size', 'C', 'min_area', 'max_area')
+
+# 단계 이름 → 이 단계가 쓰는 파라미터 (앞 단계의 파라미터와 합쳐 prefix 키가 됨)
+SWEEP_STAGES = (
+    ('contrast', ('contrast_ksize',)),
+    ('blur', ('blur_ksize',)),
+    ('contours', ('method', 'block_size', 'C')),
+)
+
+
+def expand_grid(grid):
+    """{파라미터: 값 목록}을 SWEEP_PARAMS 순서의 조합 목록으로 펼침"""
+    return [dict(zip(SWEEP_PARAMS, values)) for values in itertools.product(*(grid[name] for name in SWEEP_PARAMS))]
+
+
+def _contrast(gray, ksize):
+    enhanced, _, _ = pp.enhance_contrast(gray, ksize)
+    return cv2.equalizeHist(enhanced, dst=enhanced)
+
+
+def _contour_areas(blurred, method, block_size, C):
+    """임계처리 → 외곽 윤곽선 → 윤곽선 면적 배열 (leaf 단계)"""
+    thresh = pp.THRESHOLD_METHODS[method][0](blurred, block_size, C)
+    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return pp.compute_contour_features(contours)['area']
+
+
+class SweepEngine:
+    """번호판별 단계 결과를 prefix 단위로 한 번만 계산하는 탐색기
+
+    stage_evaluations에 실제로 계산한 단계 수를 세어, 조합마다 처음부터 계산했을 때의
+    단계 수(naive_evaluations)와 비교할 수 있습니다.
+    """
+
+    def __init__(self, grid, workers=4):
+        self.grid = grid
+        self.workers = workers
+        self.stage_evaluations = 0
+
+    def _distinct(self, names):
+        return list(itertools.product(*(self.grid[name] for name in names)))
+
+    def evaluate_plate(self, gray, executor):
+        """번호판 하나에 대해 {조합 키: 잠재적 글자 수} 계산"""
+        counts = {}
+        leaves = []
+        for (contrast_ksize,) in self._distinct(('contrast_ksize',)):
+            enhanced = _contrast(gray, contrast_ksize)
+            self.stage_evaluations += 1
+            for (blur_ksize,) in self._distinct(('blur_ksize',)):
+                blurred = cv2.GaussianBlur(enhanced, blur_ksize, 0)
+                self.stage_evaluations += 1
+                for method, block_size, C in self._distinct(('method', 'block_size', 'C')):
+                    prefix = (contrast_ksize, blur_ksize, method, block_size, C)
+                    leaves.append((prefix, executor.submit(_contour_areas, blurred, method, block_size, C)))
+                    self.stage_evaluations += 1
+
+        # 면적 범위는 같은 윤곽선 면적 배열에서 바로 계산
+        for prefix, future in leaves:
+            areas = future.result()
+            for min_area, max_area in self._distinct(('min_area', 'max_area')):
+                counts[prefix + (min_area, max_area)] = int(np.count_nonzero((areas > min_area) & (areas < max_area)))
+        return counts
+
+    def naive_evaluations(self, plate_count):
+        """조합마다 처음부터 계산했을 때의 단계 수 (로드/그레이스케일 + 대비 + 블러 + leaf)"""
+        return plate_count * len(expand_grid(self.grid)) * (2 + len(SWEEP_STAGES))
+
+    def run(self, plate_names, expected):
+        """모든 조합을 평가하여 점수 순으로 정렬된 결과 목록 반환
+
+        expected: 기대 글자 수 (정수 하나, 또는 번호판 이름 → 글자 수 dict)
+        점수는 |잠재적 글자 수 - 기대 글자 수|의 평균 (작을수록 좋음), 같으면 정확히 맞힌 번호판이 많은 순
+        """
+        errors = {}
+        exact = {}
+        evaluated = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            # 다음 번호판은 로더가 미리 읽어 두는 동안 현재 번호판의 조합을 평가
+            for plate_name, plate_img in get_plate_loader().iter_load(plate_names):
+                if plate_img is None or isinstance(plate_img, OSError):
+                    print(f"이미지를 읽을 수 없습니다: {plate_name}")
+                    continue
+                gray = pp.convert_to_grayscale(plate_img)
+                self.stage_evaluations += 2
+                target = expected[plate_name] if isinstance(expected, dict) else expected
+
+                for key, count in self.evaluate_plate(gray, executor).items():
+                    errors[key] = errors.get(key, 0) + abs(count - target)
+                    exact[key] = exact.get(key, 0) + (count == target)
+                evaluated += 1
+
+        rows = [{**dict(zip(SWEEP_PARAMS, key)), 'mean_abs_error': total / max(evaluated, 1),
+                 'exact': exact[key], 'plates': evaluated}
+                for key, total in errors.items()]
+        rows.sort(key=lambda row: (row['mean_abs_error'], -row['exact']))
+        return rows
+
+
+def pipeline_config_for(row, base_path='../pipelines/default.json'):
+    """탐색 결과 한 행을 plate_pipeline 설정으로 변환 (기본 설정의 단계 파라미터를 바꿈)"""
+    with open(base_path, encoding='utf-8') as f:
+        config = json.load(f)
+    stage_params = {
+        'enhanced': {'ksize': list(row['contrast_ksize'])},
+        'blurred': {'ksize': list(row['blur_ksize'])},
+        'threshold': {'method': row['method'], 'block_size': row['block_size'], 'C': row['C']},
+        'potential_chars': {'min_area': row['min_area'], 'max_area': row['max_area']},
+    }
+    for stage in config['stages']:
+        if stage['id'] in stage_params:
+            stage['params'] = stage_params[stage['id']]
+    config['name'] = f"{config.get('name', 'pipeline')}-tuned"
+    return config
+
+
+def _square(size):
+    return (size, size)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='번호판 파이프라인 파라미터 탐색')
+    parser.add_argument('--contrast-ksize', type=int, nargs='+', default=[2, 3, 5], help='대비 향상 커널 크기')
+    parser.add_argument('--blur-ksize', type=int, nargs='+', default=[3, 5], help='임계처리 전 블러 크기')
+    parser.add_argument('--method', nargs='+', default=['gaussian'], choices=list(pp.THRESHOLD_METHODS),
+                        help='임계처리 방법')
+    parser.add_argument('--block-size', type=int, nargs='+', default=[11, 15, 19], help='적응형 임계처리 블록 크기')
+    parser.add_argument('--C', type=int, nargs='+', default=[2, 5, 9], help='적응형 임계처리 상수')
+    parser.add_argument('--min-area', type=int, nargs='+', default=[30], help='글자 후보 최소 면적')
+    parser.add_argument('--max-area', type=int, nargs='+', default=[2000], help='글자 후보 최대 면적')
+    parser.add_argument('--expected', type=int, default=7, help='번호판당 기대 글자 수')
+    parser.add_argument('--labels', help='번호판 이름 → 기대 글자 수 JSON (지정 시 --expected 대신 사용)')
+    parser.add_argument('--workers', type=int, default=4, help='leaf 단계 병렬 스레드 수')
+    parser.add_argument('--top', type=int, default=10, help='출력할 상위 조합 수')
+    parser.add_argument('--write-pipeline', help='1위 조합을 파이프라인 설정 파일로 저장할 경로')
+    args = parser.parse_args()
+
+    grid = {
+        'contrast_ksize': [_square(k) for k in args.contrast_ksize],
+        'blur_ksize': [_square(k) for k in args.blur_ksize],
+        'method': args.method,
+        'block_size': args.block_size,
+        'C': args.C,
+        'min_area': args.min_area,
+        'max_area': args.max_area,
+    }
+    expected = args.expected
+    if args.labels:
+        with open(args.labels, encoding='utf-8') as f:
+            expected = json.load(f)
+
+    plate_names = pp.list_plate_names()
+    if isinstance(expected, dict):
+        plate_names = [name for name in plate_names if name in expected]
+
+    engine = SweepEngine(grid, args.workers)
+    start = time.perf_counter()
+    rows = engine.run(plate_names, expected)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(expand_grid(grid))}개 조합 × {len(plate_names)}개 번호판: {elapsed:.2f}초, "
+          f"단계 계산 {engine.stage_evaluations}회 (조합별로 처음부터 계산하면 {engine.naive_evaluations(len(plate_names))}회)")
+    print(f"{'rank':>4} {'contrast':>8} {'blur':>4} {'method':>13} {'block':>5} {'C':>3} {'area':>10} {'MAE':>6} {'exact':>5}")
+    for rank, row in enumerate(rows[:args.top], 1):
+        print(f"{rank:>4} {row['contrast_ksize'][0]:>8} {row['blur_ksize'][0]:>4} {row['method']:>13} "
+              f"{row['block_size']:>5} {row['C']:>3} {row['min_area']:>4}-{row['max_area']:<5} "
+              f"{row['mean_abs_error']:>6.2f} {row['exact']:>2}/{row['plates']}")
+
+    if args.write_pipeline and rows:
+        with open(args.write_pipeline, 'w', encoding='utf-8') as f:
+            json.dump(pipeline_config_for(rows[0]), f, ensure_ascii=False, indent=2)
+        print(f"1위 조합 파이프라인 설정 저장: {args.write_pipeline}")
@@ -0,0 +1,99 @@
+# 고정 카메라용 원근 변환 맵 캐시 (plate_warp_cache.py)
+#
+# 카메라가 고정되어 있으면 번호판 사각형이 매 프레임 거의 같은 위치에 있으므로,
+# 모서리 좌표를 양자화한 키로 remap 조회표를 미리 계산해 두고 재사용합니다.
+# 이후 추출은 원본 전체가 아닌 번호판 주변 ROI에 대한 cv2.remap 한 번이면 됩니다.
+#
+# 결과는 warpPerspective와 정확히 같지 않습니다. 모서리를 quantum 단위로 반올림하므로 최대 quantum/2 픽셀
+# 어긋난 사각형을 변환하고(질감이 많은 영역에서는 픽셀값이 크게 다름), 같은 모서리여도 고정소수점 조회표는
+# 좌표를 1/32 픽셀로 반올림하므로 강한 경계에서 5 정도, float 조회표는 1 이하로 다릅니다.
+
+import cv2
+import numpy as np
+from collections import OrderedDict
+
+from plate_localizer import order_corners, PLATE_WIDTH, PLATE_HEIGHT
+
+
+class WarpMapCache:
+    """양자화한 모서리 좌표 + 출력 크기를 키로 하는 LRU remap 조회표 캐시
+
+    quantum: 모서리 좌표 양자화 단위(픽셀). 이 범위 안의 흔들림은 같은 조회표를 씁니다.
+             검출된 모서리가 프레임마다 1~2픽셀씩 흔들리면 1.0으로는 거의 적중하지 않으므로
+             흔들림보다 크게 잡아야 하며, 그만큼(최대 quantum/2) 어긋난 영역을 변환합니다.
+    max_entries: 최대 항목 수. 카메라 위치가 바뀌면 새 키가 생기고, 오래 쓰지 않은
+                 조회표부터 제거됩니다.
+    fixed_point: True이면 convertMaps로 CV_16SC2 고정소수점 조회표를 만들어
+                 메모리를 줄이고 remap을 빠르게 합니다 (warpPerspective와 최대 5 정도 차이,
+                 False이면 float 조회표로 1 이하 차이).
+    """
+
+    def __init__(self, quantum=1.0, max_entries=32, fixed_point=True):
+        self.quantum = quantum
+        self.max_entries = max_entries
+        self.fixed_point = fixed_point
+        self._maps = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, corners, size, image_shape):
+        quantized = np.round(corners / self.quantum).astype(np.int64)
+        return (tuple(quantized.ravel().tolist()), size, image_shape[:2])
+
+    def _build(self, key, size, image_shape):
+        """양자화된 모서리로 출력 픽셀 → 원본 좌표 조회표와 원본 ROI 계산"""
+        corners = np.float32(key[0]).reshape(4, 2) * self.quantum
+        width, height = size
+        pts2 = np.float32([[0, 0], [width - 1, 0],
+                           [width - 1, height - 1], [0, height - 1]])
+
+        # 출력 → 원본 방향 행렬 (warpPerspective가 내부에서 쓰는 역변환과 같음)
+        inverse = cv2.getPerspectiveTransform(pts2, corners)
+
+        xs, ys = np.meshgrid(np.arange(width, dtype=np.float64), np.arange(height, dtype=np.float64))
+        src = cv2.perspectiveTransform(np.dstack([xs, ys]).reshape(-1, 1, 2), inverse).reshape(height, width, 2)
+
+        # 보간에 필요한 이웃 픽셀까지 포함하는 ROI (이미지 경계로 자름)
+        rows, cols = image_shape[:2]
+        x0 = int(np.clip(np.floor(src[..., 0].min()) - 1, 0, cols))
+        y0 = int(np.clip(np.floor(src[..., 1].min()) - 1, 0, rows))
+        x1 = int(np.clip(np.ceil(src[..., 0].max()) + 2, x0, cols))
+        y1 = int(np.clip(np.ceil(src[..., 1].max()) + 2, y0, rows))
+
+        map_x = (src[..., 0] - x0).astype(np.float32)
+        map_y = (src[..., 1] - y0).astype(np.float32)
+        if self.fixed_point:
+            map1, map2 = cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
+        else:
+            map1, map2 = map_x, map_y
+        return (slice(y0, y1), slice(x0, x1)), map1, map2
+
+    def warp(self, img, pts, width=PLATE_WIDTH, height=PLATE_HEIGHT):
+        """warp_plate와 같은 원근 변환을 캐시된 조회표로 수행"""
+        corners = order_corners(pts)
+        size = (width, height)
+        key = self._key(corners, size, img.shape)
+
+        entry = self._maps.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = self._build(key, size, img.shape)
+            self._maps[key] = entry
+            if len(self._maps) > self.max_entries:
+                self._maps.popitem(last=False)  # 가장 오래 쓰지 않은 조회표 제거
+        else:
+            self.hits += 1
+            self._maps.move_to_end(key)
+
+        roi, map1, map2 = entry
+        source = img[roi]
+        if source.size == 0:
+            # 사각형이 이미지 밖에 있으면 warpPerspective처럼 검은 이미지
+            return np.zeros((height, width) + img.shape[2:], dtype=img.dtype)
+        return cv2.remap(source, map1, map2, cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT)
+
+    def clear(self):
+        self._maps.clear()
+
+    def __len__(self):
+        return len(self._maps)
@@ -0,0 +1,247 @@
+# extracted_plates 폴더 감시 및 증분 처리 (plate_watcher.py)
+#
+# plate_extractor.py가 저장하는 새 번호판(또는 수정된 번호판)만 한 번씩 처리합니다.
+# 처리한 번호판마다 이름과 처리할 때의 수정 시각을 상태 저널에 한 줄씩 추가하므로 재시작해도 이미 처리한
+# 번호판은 다시 처리하지 않고, cp -p나 mv처럼 예전 수정 시각을 유지한 채 들어온 파일도 놓치지 않습니다.
+# 재시작할 때는 폴더 목록만 읽고 처음 보는 파일만 stat하며(--rescan이면 전체 비교), inotify를 쓸 수 있으면
+# 이후에는 이벤트로 받은 파일만 확인합니다.
+
+import os
+import json
+import time
+import argparse
+import tempfile
+
+from plate_processor import PLATE_DIR, process_extracted_plate
+from plate_loader import PlateLoader, set_plate_loader, get_plate_loader
+from plate_cache import PlateResultCache
+from plate_fileutil import chmod_default
+
+# inotify는 선택 사항: 없으면 주기적 폴링으로 동작
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+
+class WatchState:
+    """처리 진행 상태 (번호판 이름 → 처리할 때의 수정 시각)
+
+    처음 보는 이름이거나 수정 시각이 기록과 다른 파일이 새 파일입니다. 수정 시각의 최댓값만
+    기억하면 예전 수정 시각을 유지한 채 들어온 파일을 건너뛰므로 이름별로 기록합니다.
+    이전 형식(mtime_ns, names)의 상태 파일은 그 기준으로 처리한 파일을 이름별 기록으로 옮깁니다.
+
+    처리할 때마다 상태 전체를 다시 쓰지 않고 <path>.journal에 한 줄씩 추가하며, 시작할 때 저널을
+    상태 파일에 합치고 비웁니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.journal_path = path + '.journal'
+        self.plates = {}
+        self._legacy_mark = None
+        self._journal = None
+
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+            if 'plates' in state:
+                self.plates = {name: int(mtime_ns) for name, mtime_ns in state['plates'].items()}
+            else:
+                self._legacy_mark = (state['mtime_ns'], set(state['names']))
+
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        plate_name, mtime_ns = json.loads(line)
+                    except ValueError:
+                        continue  # 기록 중에 종료되어 잘린 줄
+                    self.plates[plate_name] = mtime_ns
+            self.save()
+
+    def known(self, plate_name):
+        """처리한 기록이 있는 번호판인지"""
+        return plate_name in self.plates
+
+    def is_new(self, mtime_ns, plate_name):
+        processed = self.plates.get(plate_name)
+        if processed is not None:
+            return processed != mtime_ns
+        if self._legacy_mark is not None:
+            mark_ns, names = self._legacy_mark
+            if mtime_ns < mark_ns or (mtime_ns == mark_ns and plate_name in names):
+                self.plates[plate_name] = mtime_ns
+                return False
+        return True
+
+    def advance(self, mtime_ns, plate_name):
+        """처리 완료한 파일을 반영하고 저널에 한 줄 추가 (기록된 번호판 수와 무관)"""
+        self.plates[plate_name] = mtime_ns
+        if self._journal is None:
+            self._journal = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+        os.write(self._journal, (json.dumps([plate_name, mtime_ns]) + '\n').encode('utf-8'))
+
+    def prune(self, present_names):
+        """폴더에서 사라진 번호판의 기록 삭제 (폴더 전체를 검사했을 때 호출), 바뀐 것이 있으면 상태 저장"""
+        removed = self.plates.keys() - set(present_names)
+        for plate_name in removed:
+            del self.plates[plate_name]
+        # 이전 형식에서 옮긴 기록도 상태 파일에 남김
+        if removed or self._legacy_mark is not None:
+            self._legacy_mark = None
+            self.save()
+
+    def save(self):
+        """상태 전체를 임시 파일에 쓴 뒤 rename하여 저장하고 저널을 비움
+
+        rename 뒤 저널을 지우기 전에 종료되어도 다음 시작 때 같은 기록을 다시 반영할 뿐입니다.
+        """
+        state_dir = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=state_dir, suffix='.tmp')
+        chmod_default(fd)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'plates': self.plates}, f)
+        os.replace(tmp_path, self.path)
+
+        if self._journal is not None:
+            os.close(self._journal)
+            self._journal = None
+        try:
+            os.remove(self.journal_path)
+        except FileNotFoundError:
+            pass
+
+
+def _stat_plates(plate_dir, file_names=None, skip=None):
+    """(파일 이름, 수정 시각) 목록: file_names가 없으면 폴더 전체, 있으면 그 파일만 (사라진 파일은 제외)
+
+    폴더 전체를 읽을 때 skip(번호판 이름)이 참인 파일은 stat하지 않고 수정 시각을 None으로 둡니다.
+    """
+    if file_names is None:
+        with os.scandir(plate_dir) as entries:
+            return [(entry.name, None if skip is not None and skip(entry.name[:-len('.png')])
+                     else entry.stat().st_mtime_ns)
+                    for entry in entries if entry.name.endswith('.png') and entry.is_file()]
+    stats = []
+    for file_name in file_names:
+        try:
+            stats.append((file_name, os.stat(os.path.join(plate_dir, file_name)).st_mtime_ns))
+        except FileNotFoundError:
+            continue
+    return stats
+
+
+def scan_pending_plates(state, plate_dir=None, settle=0.5, file_names=None, deferred=None, rescan=True):
+    """아직 처리하지 않은 번호판을 (수정 시각, 이름) 순서로 반환
+
+    수정된 지 settle초가 지나지 않은 파일은 아직 쓰는 중일 수 있으므로 다음 검사로 미루며,
+    deferred(set)가 있으면 미룬 파일 이름을 담습니다.
+    plate_dir가 없으면 연결된 로더의 입력 폴더를 검사합니다. file_names가 있으면 폴더 전체 대신
+    그 파일들만 확인하고, 없으면 폴더 전체를 검사하면서 사라진 번호판의 기록을 정리합니다.
+    폴더 전체를 검사할 때 rescan이 False이면 처리한 기록이 있는 파일은 stat하지 않으므로, 감시를
+    멈춘 동안 수정된 파일은 찾지 못합니다 (처음 보는 파일만 확인하는 재시작용).
+    """
+    plate_dir = get_plate_loader().base_dir if plate_dir is None else plate_dir
+    settle_before = time.time_ns() - int(settle * 1e9)
+    pending = []
+    stats = _stat_plates(plate_dir, file_names, None if rescan else state.known)
+    for file_name, mtime_ns in stats:
+        plate_name = file_name[:-len('.png')]
+        if mtime_ns is None or not state.is_new(mtime_ns, plate_name):
+            continue
+        if mtime_ns <= settle_before:
+            pending.append((mtime_ns, plate_name))
+        elif deferred is not None:
+            deferred.add(file_name)
+    if file_names is None:
+        state.prune(file_name[:-len('.png')] for file_name, _ in stats)
+    return sorted(pending)
+
+
+def process_pending_plates(state, settle=0.5, cache=None, file_names=None, deferred=None, rescan=True):
+    """대기 중인 번호판을 처리하고 하나 처리할 때마다 상태 저널에 기록, 처리 개수 반환
+
+    file_names, deferred, rescan은 scan_pending_plates와 같습니다.
+    """
+    processed = 0
+    for mtime_ns, plate_name in scan_pending_plates(state, settle=settle, file_names=file_names,
+                                                    deferred=deferred, rescan=rescan):
+        try:
+            process_extracted_plate(plate_name, keep_arrays=False, cache=cache)
+        except Exception as e:
+            # 손상된 파일 하나 때문에 감시가 멈추지 않도록 기록만 하고 넘어감
+            print(f"번호판 처리 실패: {plate_name} ({e})")
+        state.advance(mtime_ns, plate_name)
+        processed += 1
+    return processed
+
+
+def watch_plates(state_path='../plate_watch_state.json', poll_interval=1.0, settle=0.5, cache=None, use_inotify=True,
+                 rescan=False):
+    """extracted_plates 폴더를 감시하며 새 번호판을 처리 (Ctrl+C로 종료)
+
+    inotify를 쓰면 시작할 때와 이벤트 큐가 넘쳤을 때만 폴더 전체를 검사하고, 그 밖에는 이벤트로 받은
+    파일과 settle 때문에 미룬 파일만 확인합니다. 폴링은 poll_interval마다 폴더 전체를 검사합니다.
+    시작할 때의 검사는 rescan이 False이면 처음 보는 파일만 stat합니다.
+    """
+    state = WatchState(state_path)
+    plate_dir = get_plate_loader().base_dir
+
+    inotify = None
+    if use_inotify and INotify is not None:
+        inotify = INotify()
+        inotify.add_watch(plate_dir, flags.CLOSE_WRITE | flags.MOVED_TO)
+        print(f"inotify로 감시 시작: {plate_dir}")
+    else:
+        print(f"폴링({poll_interval}초)으로 감시 시작: {plate_dir}")
+
+    try:
+        file_names = None  # None이면 폴더 전체 검사
+        while True:
+            deferred = set()
+            processed = process_pending_plates(state, settle, cache, file_names, deferred, rescan)
+            rescan = True
+            if processed:
+                print(f"=== {processed}개 번호판 처리 완료 ===")
+
+            if inotify is None:
+                time.sleep(poll_interval)
+                continue
+
+            # 미룬 파일이 있으면 settle초 뒤에 다시 확인, 없으면 이벤트를 기다림
+            events = inotify.read(timeout=int((settle if deferred else poll_interval) * 1000))
+            if any(event.mask & flags.Q_OVERFLOW for event in events):
+                file_names = None
+            else:
+                file_names = deferred | {event.name for event in events if event.name.endswith('.png')}
+    except KeyboardInterrupt:
+        print("감시 종료")
+    finally:
+        if inotify is not None:
+            inotify.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='extracted_plates 폴더 감시 및 증분 처리')
+    parser.add_argument('--state', default='../plate_watch_state.json', help='처리 상태 파일')
+    parser.add_argument('--poll-interval', type=float, default=1.0, help='폴링 간격 (초)')
+    parser.add_argument('--settle', type=float, default=0.5, help='파일 쓰기 완료 대기 시간 (초)')
+    parser.add_argument('--no-inotify', action='store_true', help='inotify 대신 폴링 사용')
+    parser.add_argument('--once', action='store_true', help='대기 중인 번호판만 처리하고 종료')
+    parser.add_argument('--rescan', action='store_true',
+                        help='시작할 때 처리한 번호판도 수정 시각을 다시 비교 (멈춘 동안 수정된 파일 처리)')
+    parser.add_argument('--cache-dir', help='결과 캐시 폴더')
+    parser.add_argument('--plate-dir', default=PLATE_DIR, help='감시할 번호판 입력 폴더')
+    args = parser.parse_args()
+
+    set_plate_loader(PlateLoader(args.plate_dir))
+
+    cache = PlateResultCache(args.cache_dir) if args.cache_dir else None
+
+    if args.once:
+        count = process_pending_plates(WatchState(args.state), settle=args.settle, cache=cache, rescan=args.rescan)
+        print(f"=== {count}개 번호판 처리 완료 ===")
+    else:
+        watch_plates(args.state, poll_interval=args.poll_interval, settle=args.settle,
+                     cache=cache, use_inotify=not args.no_inotify, rescan=args.rescan)
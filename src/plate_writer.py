@@ -0,0 +1,146 @@
+import os
+import queue
+import threading
+
+import cv2
+
+
+# 현재 연결된 결과 이미지 writer (None이면 기존처럼 기본 PNG로 바로 cv2.imwrite)
+_image_writer = None
+
+
+def set_image_writer(writer):
+    """결과 이미지 writer 연결 (None이면 동기 저장), 이전 writer 반환"""
+    global _image_writer
+    previous = _image_writer
+    _image_writer = writer
+    return previous
+
+
+def get_image_writer():
+    """현재 연결된 결과 이미지 writer 반환"""
+    return _image_writer
+
+
+def output_ext():
+    """현재 writer가 저장하는 파일 확장자 (writer가 없으면 .png)"""
+    return '.png' if _image_writer is None else _image_writer.ext
+
+
+# 저장 형식 → (확장자, 압축/품질 파라미터 플래그)
+#   png: 무손실, level 0(압축 없음, 가장 빠름)~9(가장 작음), OpenCV 기본값은 1
+#   bmp: 무손실, 압축 없음 (인코딩 비용 거의 0, 파일은 가장 큼)
+#   jpg: 손실 압축, level은 품질 0~100 (이진화 결과 확인용으로는 부적합)
+IMAGE_FORMATS = {
+    'png': ('.png', cv2.IMWRITE_PNG_COMPRESSION),
+    'bmp': ('.bmp', None),
+    'jpg': ('.jpg', cv2.IMWRITE_JPEG_QUALITY),
+}
+
+
+def encode_params(fmt, level=None):
+    """cv2.imwrite에 넘길 (확장자, 파라미터 목록)"""
+    ext, flag = IMAGE_FORMATS[fmt]
+    if level is None or flag is None:
+        return ext, []
+    return ext, [flag, int(level)]
+
+
+class ImageWriter:
+    """형식/압축 수준을 지정해 호출한 스레드에서 바로 저장하는 writer"""
+
+    # write()가 반환된 뒤에도 넘긴 배열을 참조하는지 여부 (True이면 호출한 쪽이 배열을 재사용하면 안 됨)
+    retains_images = False
+    # 배치 처리에서 작업 묶음마다 flush할지 여부 (False이면 작업 프로세스가 끝날 때 flush)
+    flush_per_batch = True
+
+    def __init__(self, fmt='png', level=None):
+        self.ext, self.params = encode_params(fmt, level)
+        self.config = {'fmt': fmt, 'level': level}
+        self.errors = []
+        self._lock = threading.Lock()
+
+    def _write_now(self, path, image):
+        try:
+            if not cv2.imwrite(path, image, self.params):
+                raise OSError('cv2.imwrite 실패')
+        except Exception as e:
+            with self._lock:
+                self.errors.append((path, e))
+            print(f"결과 이미지 저장 실패: {path} ({e})")
+
+    def write(self, path, image):
+        self._write_now(path, image)
+
+    def exists(self, path):
+        return os.path.exists(path)
+
+    def flush(self):
+        """지금까지 발생한 저장 오류 목록을 반환하고 비움"""
+        with self._lock:
+            errors, self.errors = self.errors, []
+        return errors
+
+    def close(self):
+        return self.flush()
+
+
+class AsyncImageWriter(ImageWriter):
+    """제한된 크기의 큐와 백그라운드 스레드로 인코딩/디스크 쓰기를 처리하는 writer
+
+    write()는 큐에 넣고 바로 반환하며, 큐가 max_pending개로 차면 자리가 날 때까지
+    기다리므로(백프레셔) 디스크가 느려도 대기 중인 이미지가 무한히 쌓이지 않습니다.
+    넘긴 배열은 저장이 끝날 때까지 수정하면 안 됩니다.
+    cv2.imwrite는 인코딩 중 GIL을 놓으므로 스레드 수만큼 병렬로 인코딩됩니다.
+    """
+
+    retains_images = True
+
+    def __init__(self, fmt='png', level=None, threads=2, max_pending=32):
+        super().__init__(fmt, level)
+        self.config.update(threads=threads, max_pending=max_pending)
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._threads = [threading.Thread(target=self._run, name=f'image-writer-{i}', daemon=True)
+                         for i in range(threads)]
+        for thread in self._threads:
+            thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write_now(*item)
+            finally:
+                self._queue.task_done()
+
+    def write(self, path, image):
+        if not self._threads:
+            raise RuntimeError('이미 닫힌 writer입니다')
+        self._queue.put((path, image))
+
+    def flush(self):
+        """큐에 있는 이미지를 모두 저장할 때까지 기다린 뒤 저장 오류 목록을 반환하고 비움"""
+        self._queue.join()
+        return super().flush()
+
+    def close(self):
+        """남은 이미지를 모두 저장하고 스레드 종료, 저장 오류 목록 반환"""
+        errors = self.flush()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        return errors
+
+
+def create_writer(fmt='png', level=None, threads=0, max_pending=32, **container_options):
+    """설정으로 writer 생성 (threads가 0이면 동기 writer, fmt가 'container'이면 묶음 파일 writer)"""
+    if fmt == 'container':
+        from plate_container import ContainerWriter
+        return ContainerWriter(**container_options)
+    if threads <= 0:
+        return ImageWriter(fmt, level)
+    return AsyncImageWriter(fmt, level, threads, max_pending)
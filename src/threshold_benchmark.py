@@ -0,0 +1,99 @@
+# 임계처리 방법별 속도/품질 비교 (threshold_benchmark.py)
+#
+# 입력은 파이프라인과 같게 3채널로 읽어 cvtColor(convert_to_grayscale)로 흑백 변환한 뒤 대비 향상 + 블러까지
+# 적용한 번호판이며, 일치율 기준은 기본으로 OpenCV의 ADAPTIVE_THRESH_MEAN_C를 쓰는 'mean'입니다.
+
+import cv2
+import numpy as np
+import os
+import time
+import itertools
+import argparse
+
+from plate_processor import THRESHOLD_METHODS, enhance_contrast, convert_to_grayscale
+
+
+# 비교할 방법 (임계처리 방법 이름 → 구현 함수)
+REFERENCE_METHODS = {method: func for method, (func, _) in THRESHOLD_METHODS.items()}
+
+
+def load_enhanced_plates(plate_dir='../extracted_plates'):
+    """extracted_plates의 번호판을 대비 향상 후 블러까지 적용한 상태로 로드
+
+    파이프라인과 같게 3채널로 읽어 cvtColor로 흑백 변환합니다 (IMREAD_GRAYSCALE은 픽셀값이 조금 다름).
+    """
+    plates = {}
+    for filename in sorted(os.listdir(plate_dir)):
+        if not filename.endswith('.png'):
+            continue
+        img = cv2.imread(os.path.join(plate_dir, filename), cv2.IMREAD_COLOR)
+        if img is None:
+            continue
+        enhanced, _, _ = enhance_contrast(convert_to_grayscale(img))
+        cv2.equalizeHist(enhanced, dst=enhanced)
+        plates[filename[:-len('.png')]] = cv2.GaussianBlur(enhanced, (3, 3), 0)
+    return plates
+
+
+def time_method(func, blurred, repeat, block_size, C):
+    """repeat번 실행한 소요 시간의 중앙값(ms)과 마지막 결과 반환"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(blurred, block_size, C)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings)), result
+
+
+def run_benchmark(scales=(1, 4, 8), block_sizes=(11, 31), repeat=20, C=2, reference='mean'):
+    """배율/블록 크기별로 각 임계처리 방법의 시간과 기준 방법 대비 픽셀 일치율 측정"""
+    plates = load_enhanced_plates()
+    if not plates:
+        print("비교할 번호판 이미지가 없습니다.")
+        return []
+
+    rows = []
+    for scale, block_size in itertools.product(scales, block_sizes):
+        # 큰 입력을 흉내내기 위해 번호판을 확대 (scale_resize.py와 같은 INTER_CUBIC)
+        inputs = [cv2.resize(p, None, None, scale, scale, cv2.INTER_CUBIC) if scale != 1 else p
+                  for p in plates.values()]
+
+        reference_results = [REFERENCE_METHODS[reference](b, block_size, C) for b in inputs]
+
+        for method, func in REFERENCE_METHODS.items():
+            total_ms = 0.0
+            agreement = []
+            for blurred, ref in zip(inputs, reference_results):
+                ms, result = time_method(func, blurred, repeat, block_size, C)
+                total_ms += ms
+                agreement.append(np.count_nonzero(result == ref) / result.size)
+            rows.append({
+                'scale': scale,
+                'size': f'{inputs[0].shape[1]}x{inputs[0].shape[0]}',
+                'block_size': block_size,
+                'method': method,
+                'ms_per_plate': total_ms / len(inputs),
+                'agreement': float(np.mean(agreement)),
+            })
+    return rows
+
+
+def print_report(rows, reference='mean'):
+    """결과 표 출력"""
+    print(f"{'size':>11} {'block':>6} {'method':>14} {'ms/plate':>10} {'vs ' + reference:>13}")
+    for row in rows:
+        print(f"{row['size']:>11} {row['block_size']:>6} {row['method']:>14} {row['ms_per_plate']:>10.3f} "
+              f"{row['agreement'] * 100:>12.2f}%")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='임계처리 방법별 속도/품질 비교')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 4, 8], help='번호판 확대 배율')
+    parser.add_argument('--block-sizes', type=int, nargs='+', default=[11, 31], help='적응형 블록 크기')
+    parser.add_argument('--repeat', type=int, default=20, help='방법별 반복 횟수')
+    parser.add_argument('--reference', default='mean', choices=list(REFERENCE_METHODS),
+                        help='픽셀 일치율 기준 방법')
+    args = parser.parse_args()
+
+    print_report(run_benchmark(scales=args.scales, block_sizes=args.block_sizes, repeat=args.repeat,
+                               reference=args.reference), args.reference)
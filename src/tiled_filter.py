@@ -0,0 +1,249 @@
+# 큰 이미지용 타일 필터 실행기 (tiled_filter.py)
+#
+# blur_median.py, blur_bilateral.py, morph_open_close.py, edge_canny.py 등은 이미지 전체에
+# OpenCV 함수를 한 번 적용합니다. 파노라마처럼 아주 큰 이미지는 작업 메모리가 커지고 캐시 효율이
+# 나쁘므로, 이미지를 타일로 나누고 각 타일에 커널 반지름만큼의 여백(halo)을 붙여 스레드 풀에서
+# 필터를 적용한 뒤 여백을 뺀 가운데 부분만 이어 붙입니다. 여백 안의 경계 처리는 버려지고
+# 이미지 가장자리의 타일은 원본 가장자리에서 같은 경계 처리를 하므로 결과는 전체 적용과 비트 단위로 같습니다.
+# 단, bilateral은 OpenCV가 행 끝의 SIMD 폭에 못 미치는 픽셀을 스칼라 코드로 다른 순서로 누적하므로
+# 타일 경계 위치에 따라 일부 픽셀이 1 다를 수 있습니다 (APPROXIMATE_FILTERS, 타일 크기 정렬로도 없어지지 않음).
+#
+# 입력/출력이 .npy이면 np.memmap으로 열어 타일 단위로 읽고 쓰므로 메모리보다 큰 이미지도 처리합니다.
+#   python tiled_filter.py median ../img/salt_pepper_noise.jpg out.png --ksize 5
+#   python tiled_filter.py bilateral big.npy big_out.npy --tile 1024 --workers 8
+
+import os
+import time
+import argparse
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+
+def _gaussian_ksize(sigma):
+    # GaussianBlur에 ksize (0, 0)을 주었을 때 OpenCV가 sigma로 정하는 8비트 커널 크기
+    return int(round(sigma * 3 * 2 + 1)) | 1
+
+
+def _gaussian(tile, ksize=5, sigma=0):
+    return cv2.GaussianBlur(tile, (ksize, ksize), sigma)
+
+
+def _gaussian_halo(ksize=5, sigma=0):
+    return (ksize or _gaussian_ksize(sigma)) // 2
+
+
+def _median(tile, ksize=5):
+    return cv2.medianBlur(tile, ksize)
+
+
+def _bilateral(tile, d=5, sigma_color=75, sigma_space=75):
+    return cv2.bilateralFilter(tile, d, sigma_color, sigma_space)
+
+
+def _bilateral_halo(d=5, sigma_color=75, sigma_space=75):
+    # d <= 0이면 OpenCV는 sigma_space * 1.5를 반지름으로 씀
+    return d // 2 if d > 0 else int(round(sigma_space * 1.5))
+
+
+_MORPH_OPS = {'erode': (cv2.MORPH_ERODE, 1), 'dilate': (cv2.MORPH_DILATE, 1),
+              'open': (cv2.MORPH_OPEN, 2), 'close': (cv2.MORPH_CLOSE, 2), 'gradient': (cv2.MORPH_GRADIENT, 1)}
+
+
+def _morph_filter(op):
+    def apply(tile, ksize=5, iterations=1):
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (ksize, ksize))
+        return cv2.morphologyEx(tile, _MORPH_OPS[op][0], kernel, iterations=iterations)
+    return apply
+
+
+def _morph_halo(op):
+    # 열림/닫힘은 침식과 팽창을 이어서 하므로 반지름이 두 배
+    def halo(ksize=5, iterations=1):
+        return (ksize // 2) * iterations * _MORPH_OPS[op][1]
+    return halo
+
+
+def _canny_local(tile, threshold=100, aperture=3, l2=False):
+    # 두 임계값을 같게 주면 이력(hysteresis) 연결 없이 비최대 억제 + 임계값만 하므로 타일로 나눌 수 있음
+    return cv2.Canny(tile, threshold, threshold, apertureSize=aperture, L2gradient=l2)
+
+
+def _canny_halo(threshold=100, aperture=3, l2=False):
+    # Sobel 반지름 + 비최대 억제의 이웃 1픽셀 + 여유 1픽셀
+    return aperture // 2 + 2
+
+
+# 필터 이름 → (타일 함수(tile, **params), 여백 크기 함수(**params))
+TILED_FILTERS = {
+    'gaussian': (_gaussian, _gaussian_halo),
+    'median': (_median, lambda ksize=5: ksize // 2),
+    'bilateral': (_bilateral, _bilateral_halo),
+    **{op: (_morph_filter(op), _morph_halo(op)) for op in _MORPH_OPS},
+    'canny_local': (_canny_local, _canny_halo),
+}
+
+# 전체 적용과 비트 단위로 같지 않고 픽셀값이 최대 이만큼 다를 수 있는 필터
+APPROXIMATE_FILTERS = {'bilateral': 1}
+
+
+def iter_tiles(shape, tile_size, halo):
+    """(가운데 영역 slice, 여백 포함 영역 slice, 여백 포함 타일 안에서 가운데 영역 slice)를 yield"""
+    rows, cols = shape[:2]
+    for top, left in itertools.product(range(0, rows, tile_size), range(0, cols, tile_size)):
+        bottom, right = min(top + tile_size, rows), min(left + tile_size, cols)
+        pad_top, pad_left = max(0, top - halo), max(0, left - halo)
+        pad_bottom, pad_right = min(rows, bottom + halo), min(cols, right + halo)
+        yield ((slice(top, bottom), slice(left, right)),
+               (slice(pad_top, pad_bottom), slice(pad_left, pad_right)),
+               (slice(top - pad_top, bottom - pad_top), slice(left - pad_left, right - pad_left)))
+
+
+class TiledExecutor:
+    """이미지를 tile_size 크기 타일로 나누어 workers개 스레드에서 필터를 적용하는 실행기
+
+    OpenCV 필터는 GIL을 놓으므로 스레드로 여러 타일을 동시에 처리합니다. 동시에 처리 중인
+    타일은 max_pending개(기본 workers * 2)로 제한하여, memmap 입력에서도 메모리에 올라오는
+    양이 타일 몇 개 분량을 넘지 않습니다.
+    """
+
+    def __init__(self, tile_size=512, workers=4, max_pending=None):
+        self.tile_size = tile_size
+        self.workers = workers
+        self.max_pending = max_pending or workers * 2
+
+    def _run_tile(self, func, src, out, tile, params):
+        core, padded, inner = tile
+        # memmap 입력은 여기서 타일 부분만 디스크에서 읽음
+        result = func(np.ascontiguousarray(src[padded]), **params)
+        out[core] = result[inner]
+
+    def map(self, func, src, out, halo, params):
+        """src의 타일마다 func(tile, **params)를 적용하여 out에 기록"""
+        tiles = iter_tiles(src.shape, self.tile_size, halo)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='tiled-filter') as executor:
+            pending = deque(executor.submit(self._run_tile, func, src, out, tile, params)
+                            for tile in itertools.islice(tiles, self.max_pending))
+            while pending:
+                pending.popleft().result()
+                for tile in itertools.islice(tiles, 1):
+                    pending.append(executor.submit(self._run_tile, func, src, out, tile, params))
+        return out
+
+    def apply(self, name, src, out=None, **params):
+        """TILED_FILTERS의 필터를 타일로 적용 (out이 없으면 새 배열, 결과는 전체 적용과 같음,
+        APPROXIMATE_FILTERS는 허용 오차 안에서 같음)"""
+        if name == 'canny':
+            return self.canny(src, out=out, **params)
+        func, halo = TILED_FILTERS[name]
+        if out is None:
+            out = np.empty_like(src)
+        return self.map(func, src, out, halo(**params), params)
+
+    def canny(self, src, low=100, high=200, aperture=3, l2=False, out=None, strong=None):
+        """cv2.Canny(src, low, high)와 같은 결과를 타일로 계산
+
+        이력 연결은 멀리까지 이어질 수 있어 타일로 나눌 수 없으므로, low와 high 각각으로
+        비최대 억제 + 임계값 처리만 타일로 한 뒤(약한/강한 엣지 후보), 강한 엣지를 포함하는
+        약한 후보의 8-연결 성분만 남깁니다. 이 마지막 단계는 이진 영상 전체에 대해 한 번
+        connectedComponents를 하므로 픽셀당 5바이트(라벨 int32 + 마스크)의 메모리가 필요합니다.
+        strong: 강한 엣지 후보를 쓸 (rows, cols) uint8 배열 (memmap 가능, 없으면 새로 할당)
+        """
+        shape = src.shape[:2]
+        if out is None:
+            out = np.empty(shape, dtype=np.uint8)
+        if strong is None:
+            strong = np.empty(shape, dtype=np.uint8)
+        func, halo = TILED_FILTERS['canny_local']
+        self.map(func, src, out, halo(aperture=aperture), {'threshold': low, 'aperture': aperture, 'l2': l2})
+        self.map(func, src, strong, halo(aperture=aperture), {'threshold': high, 'aperture': aperture, 'l2': l2})
+
+        count, labels = cv2.connectedComponents(np.asarray(out), connectivity=8, ltype=cv2.CV_32S)
+        keep = np.zeros(count, dtype=np.uint8)
+        keep[labels[np.asarray(strong) > 0]] = 255
+        keep[0] = 0
+        # 라벨 → 결과를 행 묶음 단위로 기록 (memmap 출력에서 한 번에 모두 쓰지 않도록)
+        for top in range(0, shape[0], self.tile_size):
+            rows = slice(top, top + self.tile_size)
+            out[rows] = keep[labels[rows]]
+        return out
+
+
+def apply_whole(name, src, **params):
+    """비교용: 같은 필터를 이미지 전체에 한 번 적용"""
+    if name == 'canny':
+        return cv2.Canny(src, params.get('low', 100), params.get('high', 200),
+                         apertureSize=params.get('aperture', 3), L2gradient=params.get('l2', False))
+    return TILED_FILTERS[name][0](src, **params)
+
+
+def _open_input(path):
+    """.npy는 memmap(읽기 전용)으로, 다른 형식은 imread로 전체를 읽음"""
+    if path.endswith('.npy'):
+        return np.load(path, mmap_mode='r')
+    img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    if img is None:
+        raise OSError(f'이미지를 읽을 수 없습니다: {path}')
+    return img
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='큰 이미지용 타일 필터 실행기')
+    parser.add_argument('filter', choices=sorted(TILED_FILTERS.keys() - {'canny_local'} | {'canny'}),
+                        help='적용할 필터')
+    parser.add_argument('input', help='입력 이미지 (.npy이면 memmap으로 타일 단위 읽기)')
+    parser.add_argument('output', nargs='?', help='출력 경로 (.npy이면 memmap으로 타일 단위 쓰기)')
+    parser.add_argument('--tile', type=int, default=512, help='타일 크기 (여백 제외)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='스레드 수')
+    parser.add_argument('--ksize', type=int, help='커널 크기 (gaussian, median, 모폴로지)')
+    parser.add_argument('--iterations', type=int, help='모폴로지 반복 횟수')
+    parser.add_argument('--d', type=int, help='bilateral 이웃 지름')
+    parser.add_argument('--sigma-color', type=float, help='bilateral 색 시그마')
+    parser.add_argument('--sigma-space', type=float, help='bilateral 공간 시그마')
+    parser.add_argument('--low', type=float, help='canny 낮은 임계값')
+    parser.add_argument('--high', type=float, help='canny 높은 임계값')
+    parser.add_argument('--verify', action='store_true',
+                        help='전체 적용 결과와 비트 단위로 같은지 확인 (bilateral은 허용 오차 안인지 확인)')
+    args = parser.parse_args()
+
+    params = {name: value for name, value in
+              (('ksize', args.ksize), ('iterations', args.iterations), ('d', args.d),
+               ('sigma_color', args.sigma_color), ('sigma_space', args.sigma_space),
+               ('low', args.low), ('high', args.high))
+              if value is not None}
+
+    src = _open_input(args.input)
+    out = None
+    if args.output and args.output.endswith('.npy'):
+        shape = src.shape[:2] if args.filter == 'canny' else src.shape
+        out = np.lib.format.open_memmap(args.output, mode='w+', dtype=np.uint8 if args.filter == 'canny' else src.dtype,
+                                        shape=shape)
+
+    executor = TiledExecutor(args.tile, args.workers)
+    start = time.perf_counter()
+    result = executor.apply(args.filter, src, out, **params)
+    elapsed = time.perf_counter() - start
+    print(f"{args.filter}: {src.shape} 타일 {args.tile}px x {args.workers}스레드, {elapsed * 1000:.1f}ms")
+
+    if args.output:
+        if isinstance(result, np.memmap):
+            result.flush()
+        else:
+            cv2.imwrite(args.output, result)
+
+    if args.verify:
+        start = time.perf_counter()
+        expected = apply_whole(args.filter, np.asarray(src), **params)
+        elapsed = time.perf_counter() - start
+        diff = cv2.absdiff(expected, np.asarray(result))
+        max_diff = int(diff.max()) if diff.size else 0
+        if max_diff == 0:
+            verdict = '동일'
+        else:
+            tolerance = APPROXIMATE_FILTERS.get(args.filter, 0)
+            verdict = (f"{'허용 오차 안' if max_diff <= tolerance else '다름'} "
+                       f"(최대 차이 {max_diff}, {np.count_nonzero(diff)}개 값)")
+        print(f"전체 적용: {elapsed * 1000:.1f}ms, 결과 {verdict}")